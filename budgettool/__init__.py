@@ -1,6 +1,54 @@
-"""Budget forecasting and editing tool."""
-from .budget import Budget
-from .budget_loader import budget_from_json
-from .csv_view import save_forecast_to_csv
-from .matplot_view import plot_forecast
-from .forecast import forecast
+"""Budget forecasting and editing tool.
+
+The public names are imported on first use, so a program that only writes
+csv files never loads matplotlib.
+"""
+import importlib
+import sys
+import types
+
+# public name -> module it is defined in
+_LAZY_NAMES = {
+    'Budget'                  : 'budget',
+    'budget_from_json'        : 'budget_loader',
+    'save_forecast_to_csv'    : 'csv_view',
+    'save_forecast_to_npy'    : 'binary_view',
+    'load_forecast_npy'       : 'binary_view',
+    'save_forecast_to_sqlite' : 'sqlite_view',
+    'plot_forecast'           : 'matplot_view',
+    'render_forecast'         : 'matplot_view',
+    'forecast'                : 'forecast',
+    'ForecastStats'           : 'stats',
+}
+
+__all__ = sorted(_LAZY_NAMES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_NAMES:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    module = importlib.import_module('.' + _LAZY_NAMES[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+class _Package(types.ModuleType):
+    """Keeps public names which are also submodules, like forecast, bound to
+    the function rather than the submodule.
+
+    Importing a submodule sets it as an attribute of the package, which would
+    otherwise hide the function. Modules in the package therefore import from
+    .forecast rather than the forecast module itself.
+    """
+    def __setattr__(self, name, value):
+        if isinstance(value, types.ModuleType) and _LAZY_NAMES.get(name) == name:
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
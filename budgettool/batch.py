@@ -0,0 +1,192 @@
+"""Forecast many budget files in parallel and save each forecast."""
+import collections
+import concurrent.futures
+import glob
+import os
+import time
+
+from .budget_loader import budget_from_json
+from .csv_view import save_forecast_to_csv
+from .binary_view import save_forecast_to_npy
+from . import sqlite_view
+
+BatchResult = collections.namedtuple(
+    "BatchResult", ["filename", "output", "seconds", "entries", "error"])
+
+
+def find_budgets(pattern):
+    """List the budget files in a directory or matching a glob pattern."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.json')
+    return sorted(glob.glob(pattern))
+
+
+def output_name(filename, out_dir=None, extension='.csv', root=None):
+    """Path of the output file for a budget file.
+
+    The output is written to out_dir, or next to the budget if out_dir is None.
+    If root is given the budget's directory relative to root is kept under
+    out_dir, so budgets with the same name in different directories don't
+    overwrite each other.
+    """
+    base = os.path.splitext(os.path.basename(filename))[0] + extension
+    if out_dir is None:
+        return os.path.join(os.path.dirname(filename), base)
+    if root is not None:
+        directory = os.path.relpath(os.path.dirname(os.path.abspath(filename)), root)
+        out_dir = os.path.normpath(os.path.join(out_dir, directory))
+    return os.path.join(out_dir, base)
+
+
+def _common_root(filenames):
+    """Deepest directory containing all the files."""
+    if not filenames:
+        return None
+    return os.path.commonpath([os.path.dirname(os.path.abspath(filename))
+                               for filename in filenames])
+
+
+def _forecast_file(job):
+    """Load, forecast and save one budget. Runs in a worker process."""
+    filename, output, cache_dir, chart, cents = job
+    start = time.perf_counter()
+    try:
+        budget = budget_from_json(filename, cache_dir=cache_dir, cents=cents)
+        forecast = budget.forecast(columnar=True)
+        if output.endswith('.npy'):
+            save_forecast_to_npy(forecast, output)
+        else:
+            save_forecast_to_csv(forecast, output)
+        if chart is not None:
+            # matplotlib is only imported by workers which draw charts
+            from .matplot_view import render_forecast
+            render_forecast(forecast, chart)
+    except Exception as err: # pylint: disable=broad-except
+        # one bad budget shouldn't stop the rest of the batch
+        return BatchResult(filename, output, time.perf_counter() - start, 0,
+                           "{}: {}".format(type(err).__name__, err))
+    return BatchResult(filename, output, time.perf_counter() - start,
+                       len(forecast), None)
+
+
+def forecast_files(filenames, out_dir=None, workers=None, chunksize=None,
+                   cache_dir=None, binary=False, charts=False, cents=False):
+    """Forecast each budget file and save it as csv.
+
+    Parameters
+    -----
+    filenames - list of budget json files
+    out_dir - (optional) directory for the csv files, see output_name(). The
+        budgets' directories below the one they all share are recreated in it.
+    workers - number of worker processes, defaults to the number of cpus.
+        With 1 the files are processed in this process.
+    chunksize - number of files sent to a worker at a time. By default the
+        files are split into about 4 chunks per worker.
+    cache_dir - (optional) directory to cache parsed budgets in
+    binary - save binary .npy files instead, see binary_view
+    charts - also save a .png chart of each forecast, see
+        matplot_view.render_forecast()
+    cents - add up the balances exactly in integer cents, see budget.Budget
+
+    Returns a list of BatchResult in the same order as filenames. Raises
+    ValueError if two budgets would be saved to the same file.
+    """
+    extension = '.npy' if binary else '.csv'
+    root = _common_root(filenames)
+    jobs = [(filename, output_name(filename, out_dir, extension, root), cache_dir,
+             output_name(filename, out_dir, '.png', root) if charts else None, cents)
+            for filename in filenames]
+    outputs = collections.Counter(job[1] for job in jobs)
+    clashes = sorted(output for output, count in outputs.items() if count > 1)
+    if clashes:
+        raise ValueError("several budgets would be saved to {}".format(
+            ", ".join(clashes)))
+    if out_dir is not None:
+        for output in outputs:
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+    return list(_map_jobs(_forecast_file, jobs, workers, chunksize))
+
+
+def _map_jobs(function, jobs, workers=None, chunksize=None):
+    """Run function on each job in worker processes, see forecast_files().
+
+    Yields the results in the same order as jobs, as they become available.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (4 * workers))
+
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield function(job)
+        return
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(function, jobs, chunksize=chunksize)
+
+
+def _load_forecast(job):
+    """Load and forecast one budget. Runs in a worker process.
+
+    Returns (seconds, forecast, error), forecast is None if it failed.
+    """
+    filename, cache_dir, cents = job
+    start = time.perf_counter()
+    try:
+        budget = budget_from_json(filename, cache_dir=cache_dir, cents=cents)
+        forecast = budget.forecast(columnar=True)
+    except Exception as err: # pylint: disable=broad-except
+        return (time.perf_counter() - start, None,
+                "{}: {}".format(type(err).__name__, err))
+    return time.perf_counter() - start, forecast, None
+
+
+def forecast_to_sqlite(filenames, database, workers=None, chunksize=None,
+                       cache_dir=None, cents=False):
+    """Forecast each budget file and save them all into one SQLite database.
+
+    The budgets are keyed by their absolute filename, see sqlite_view. The
+    forecasts are computed in worker processes, see forecast_files() for
+    the parameters. SQLite allows one writer at a time, so they are saved
+    from this process as they arrive.
+
+    Returns a list of BatchResult in the same order as filenames.
+    """
+    jobs = [(filename, cache_dir, cents) for filename in filenames]
+    results = []
+    connection = sqlite_view.connect(database)
+    try:
+        for filename, (seconds, forecast, error) in zip(
+                filenames, _map_jobs(_load_forecast, jobs, workers, chunksize)):
+            start = time.perf_counter()
+            if error is None:
+                try:
+                    sqlite_view.save_forecast_to_sqlite(forecast, connection,
+                                                        os.path.abspath(filename))
+                except Exception as err: # pylint: disable=broad-except
+                    error = "{}: {}".format(type(err).__name__, err)
+            seconds += time.perf_counter() - start
+            results.append(BatchResult(filename, database, seconds,
+                                       0 if error else len(forecast), error))
+    finally:
+        connection.close()
+    return results
+
+
+def format_report(results, wall_seconds=None):
+    """Summary of a batch run with one line per file."""
+    lines = []
+    for result in results:
+        if result.error is None:
+            lines.append("{:9.3f}s {:10d} entries  {}".format(
+                result.seconds, result.entries, result.filename))
+        else:
+            lines.append("{:9.3f}s     FAILED          {}: {}".format(
+                result.seconds, result.filename, result.error))
+
+    failed = sum(1 for result in results if result.error is not None)
+    summary = "{} files, {} failed, {:.3f}s total in workers".format(
+        len(results), failed, sum(result.seconds for result in results))
+    if wall_seconds is not None:
+        summary += ", {:.3f}s elapsed".format(wall_seconds)
+    lines.append(summary)
+    return "\n".join(lines)
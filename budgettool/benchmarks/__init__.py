@@ -0,0 +1,5 @@
+"""Performance benchmarks.
+
+Each module can be run on its own, for example
+python3 -m budgettool.benchmarks.bench_dates
+"""
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark parsing a budget with many exception dates.
+
+Compares fileutils.str_to_date with plain strptime, the way dates used to be
+parsed. Several modules import str_to_date by name, so the baseline replaces
+it in each of them. Only Budget.from_dict is timed, on a dictionary which is
+already decoded, so json decoding and the budget cache are left out.
+
+python3 -m budgettool.benchmarks.bench_dates [num_exceptions]
+"""
+import contextlib
+import datetime
+import sys
+import timeit
+from unittest import mock
+
+from ..budget import Budget
+from .. import fileutils
+
+
+def _strptime_date(datestr):
+    return datetime.datetime.strptime(datestr, '%d %B %Y').date()
+
+
+def _use_parser(parser):
+    """Context manager parsing dates with parser in every module of the
+    package which imported str_to_date.
+    """
+    package = __package__.split('.')[0] + '.'
+    fast_parser = fileutils.str_to_date
+    stack = contextlib.ExitStack()
+    for name, module in list(sys.modules.items()):
+        if (name.startswith(package)
+                and getattr(module, 'str_to_date', None) is fast_parser):
+            stack.enter_context(mock.patch.object(module, 'str_to_date', parser))
+    return stack
+
+
+def _budget_dict(num_exceptions):
+    """Storage dictionary of a budget whose one template has num_exceptions
+    exceptions.
+    """
+    first = datetime.date(2000, 1, 7)
+    exceptions = [
+        {'date': fileutils.date_to_str(first + datetime.timedelta(7 * week)),
+         'amount': 1000.0 + week % 100}
+        for week in range(num_exceptions)]
+    return {
+        'filetype': 'budgettool',
+        'version': 1,
+        'start_balance': 100.0,
+        'start_date': '1 January 2000',
+        'duration': {'weeks': 52},
+        'budget': [
+            {'name': 'paycheck', 'category': 'income', 'amount': 1234.56,
+             'schedule': {'type': 'everynweek',
+                          'data': {'start': '7 January 2000', 'step': 1}},
+             'except': exceptions},
+        ],
+    }
+
+
+def _time_parse(data, repeat):
+    """Best time to build the budget from data, with no dates cached."""
+    def parse():
+        if hasattr(fileutils.str_to_date, 'cache_clear'):
+            fileutils.str_to_date.cache_clear()
+        Budget.from_dict(data)
+    return min(timeit.repeat(parse, number=1, repeat=repeat))
+
+
+def run(num_exceptions=100000, repeat=7):
+    """Time parsing a budget using strptime and the fast parser.
+
+    Returns a dictionary of the timings in seconds.
+    """
+    data = _budget_dict(num_exceptions)
+    with _use_parser(_strptime_date):
+        strptime_time = _time_parse(data, repeat)
+    fast_time = _time_parse(data, repeat)
+
+    return {
+        'num_exceptions': num_exceptions,
+        'strptime_seconds': strptime_time,
+        'fast_seconds': fast_time,
+        'speedup': strptime_time / fast_time,
+    }
+
+
+if __name__ == "__main__":
+    RESULTS = run(*[int(arg) for arg in sys.argv[1:2]])
+    print("parse budget with {num_exceptions} exception dates\n"
+          "  strptime: {strptime_seconds:.3f}s\n"
+          "  fast:     {fast_seconds:.3f}s\n"
+          "  speedup:  {speedup:.1f}x".format(**RESULTS))
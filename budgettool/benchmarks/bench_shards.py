@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark forecasting in date shards across worker processes.
+
+Each horizon is forecast in this process and split into shards, whatever
+MIN_SHARD_ENTRIES and the number of cpus say, to show where starting the
+processes starts to pay off.
+The last column is what forecast(..., workers=N) does by default.
+
+python3 -m budgettool.benchmarks.bench_shards [workers] [templates]
+"""
+import datetime
+import importlib
+import os
+import sys
+import timeit
+from unittest import mock
+
+from ..budget import Budget
+from ..forecast import ForecastResult
+from .synthetic import synthetic_budget
+
+# the package's forecast attribute is the function
+_forecast = importlib.import_module(ForecastResult.__module__)
+
+HORIZONS = (1, 5, 10, 30, 100)
+
+
+def _best(function, repeat):
+    """Best time in seconds of calling function repeat times."""
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def run(workers=None, num_templates=200, horizons=HORIZONS, repeat=3):
+    """Time serial and sharded forecasts of synthetic budgets.
+
+    Returns a list with a dictionary of the timings for each horizon in years.
+    """
+    workers = workers or os.cpu_count() or 2
+    results = []
+    for years in horizons:
+        budget = Budget.from_dict(synthetic_budget(num_templates=num_templates,
+                                                   years=years, seed=0))
+        last = budget.start_date + budget.duration - datetime.timedelta(1)
+
+        def expand(workers=workers, budget=budget, last=last):
+            return ForecastResult.from_templates(budget.start_balance, budget.budget,
+                                                 budget.start_date, last,
+                                                 workers=workers)
+
+        with mock.patch('os.cpu_count', return_value=workers), \
+             mock.patch.object(_forecast, 'MIN_SHARD_ENTRIES', 1):
+            sharded = _best(expand, repeat)
+        results.append({
+            'years': years,
+            'entries': len(expand(1)),
+            'serial_seconds': _best(lambda: expand(1), repeat),
+            'sharded_seconds': sharded,
+            'sharded_by_default': len(_forecast._shards(
+                budget.budget, budget.start_date, last, workers)) > 1,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    TEMPLATES = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    print("years    entries    serial   sharded  default")
+    for result in run(WORKERS, TEMPLATES):
+        print("{years:5d} {entries:10d} {serial_seconds:8.3f}s {sharded_seconds:8.3f}s"
+              "  {}".format('sharded' if result['sharded_by_default'] else 'serial',
+                            **result))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Benchmark the start up cost of a csv only run.
+
+Each timing is a fresh interpreter, the way batch workers and run_forecast.py
+are started. Importing matplotlib.pyplot as well shows what every run used to
+pay before the package imported its names lazily.
+
+python3 -m budgettool.benchmarks.bench_startup [repeat]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'example.json')
+
+_IMPORT = "import budgettool"
+_IMPORT_PLOT = "import budgettool, matplotlib.pyplot"
+_CSV = ("import sys, budgettool as bt\n"
+        "budget = bt.budget_from_json(sys.argv[1])\n"
+        "bt.save_forecast_to_csv(budget.forecast(columnar=True), sys.argv[2])\n"
+        "assert 'matplotlib' not in sys.modules")
+
+
+def _time_python(code, args, repeat):
+    """Best wall time to run code in a new interpreter."""
+    # the package root, so this works without installing budgettool
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=root)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code] + args, check=True, env=env)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(repeat=5):
+    """Time a bare interpreter, importing the package and a csv run.
+
+    Returns a dictionary of the timings in seconds.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out_csv = os.path.join(tmpdir, 'forecast.csv')
+        return {
+            'python_seconds': _time_python('pass', [], repeat),
+            'import_seconds': _time_python(_IMPORT, [], repeat),
+            'import_with_pyplot_seconds': _time_python(_IMPORT_PLOT, [], repeat),
+            'csv_seconds': _time_python(_CSV, [EXAMPLE, out_csv], repeat),
+        }
+
+
+if __name__ == "__main__":
+    RESULTS = run(*[int(arg) for arg in sys.argv[1:2]])
+    print("start up, best of runs in a new interpreter\n"
+          "  python:                     {python_seconds:.3f}s\n"
+          "  import budgettool:          {import_seconds:.3f}s\n"
+          "  import with pyplot:         {import_with_pyplot_seconds:.3f}s\n"
+          "  example.json to csv:        {csv_seconds:.3f}s".format(**RESULTS))
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Time the forecast path on a synthetic budget.
+
+The scenarios cover loading, parsing, expanding each schedule type,
+forecasting, csv output and rendering a chart. The timings can be saved as
+json and compared with an earlier run to catch regressions.
+
+python3 -m budgettool.benchmarks.bench_suite [--templates N] [--years N]
+    [--exceptions F] [-o results.json] [--compare old.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import tempfile
+import timeit
+
+import numpy as np
+
+from .. import jsonparser
+from .. import fileutils
+from ..budget import Budget
+from ..forecast import forecast
+from ..csv_view import save_forecast_to_csv
+from .synthetic import synthetic_budget
+
+
+def _best(function, repeat):
+    """Best time in seconds of calling function repeat times."""
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def _scenarios(filename, out_dir):
+    """List of (name, function) to time for the budget saved in filename."""
+    data = jsonparser.load(filename)
+    budget = Budget.from_dict(data, filename)
+    end = budget.start_date + budget.duration - datetime.timedelta(1)
+    result = budget.forecast(columnar=True)
+    # imported here so only this scenario pays for matplotlib
+    from ..matplot_view import render_forecast
+
+    def parse():
+        # parsing the same dates again would only time the cache
+        if hasattr(fileutils.str_to_date, 'cache_clear'):
+            fileutils.str_to_date.cache_clear()
+        Budget.from_dict(data, filename)
+
+    def render():
+        render_forecast(result, os.path.join(out_dir, 'forecast.png'))
+
+    scenarios = [
+        ('jsonparser.load', lambda: jsonparser.load(filename)),
+        ('Budget.from_dict', parse),
+    ]
+    for schedule_type in sorted({item.schedule.schedule_type for item in budget.budget}):
+        schedules = [item.schedule for item in budget.budget
+                     if item.schedule.schedule_type == schedule_type]
+        def iterate(schedules=schedules):
+            for schedule in schedules:
+                for _ in schedule.view(budget.start_date, end):
+                    pass
+        scenarios.append(('view.' + schedule_type, iterate))
+    scenarios += [
+        ('forecast', lambda: forecast(budget.start_balance, budget.budget,
+                                      budget.start_date, end)),
+        ('forecast.columnar', lambda: forecast(budget.start_balance, budget.budget,
+                                               budget.start_date, end,
+                                               columnar=True)),
+        ('save_forecast_to_csv', lambda: save_forecast_to_csv(
+            result, os.path.join(out_dir, 'forecast.csv'))),
+        ('render_forecast', render),
+    ]
+    return scenarios
+
+
+def run(num_templates=200, years=30, exception_density=0.05, seed=0, repeat=3):
+    """Run every scenario on a synthetic budget.
+
+    Returns a dictionary with the configuration, environment and the best time
+    in seconds of each scenario, which can be saved as json.
+    """
+    config = {
+        'num_templates': num_templates,
+        'years': years,
+        'exception_density': exception_density,
+        'seed': seed,
+        'repeat': repeat,
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'budget.json')
+        jsonparser.save(synthetic_budget(num_templates, None, exception_density,
+                                         years, seed), filename)
+        timings = {}
+        for name, function in _scenarios(filename, tmpdir):
+            timings[name] = _best(function, repeat)
+        entries = len(Budget.from_dict(jsonparser.load(filename)).forecast(columnar=True))
+
+    return {
+        'config': config,
+        'entries': entries,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'timings': timings,
+    }
+
+
+def format_results(results, baseline=None):
+    """Table of the timings, with the ratio to a baseline run if given."""
+    lines = ["{entries} entries from {num_templates} templates over {years} years".format(
+        entries=results['entries'], **results['config'])]
+    for name, seconds in results['timings'].items():
+        line = "  {:24s} {:9.4f}s".format(name, seconds)
+        if baseline is not None and name in baseline['timings']:
+            line += "  {:6.2f}x baseline".format(seconds / baseline['timings'][name])
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templates", type=int, default=200)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--exceptions", type=float, default=0.05,
+                        help="fraction of events with an exception amount")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", dest="out_json", metavar="json",
+                        help="save the results as json")
+    parser.add_argument("--compare", metavar="json",
+                        help="results of an earlier run to compare against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    ARGS = _args()
+    RESULTS = run(ARGS.templates, ARGS.years, ARGS.exceptions, ARGS.seed, ARGS.repeat)
+    BASELINE = None
+    if ARGS.compare is not None:
+        with open(ARGS.compare) as infile:
+            BASELINE = json.load(infile)
+    print(format_results(RESULTS, BASELINE))
+    if ARGS.out_json is not None:
+        with open(ARGS.out_json, 'w') as outfile:
+            json.dump(RESULTS, outfile, indent=4)
@@ -0,0 +1,91 @@
+"""Generate synthetic budgets of a given size for benchmarks.
+
+The budgets are dictionaries in the standard storage format, so they can be
+saved with jsonparser.save() or loaded with Budget.from_dict().
+"""
+import datetime
+import random
+
+from .. import schedulers
+from ..fileutils import date_to_str, duration_to_dict
+from ..transaction import TemplateTransaction
+
+# default share of templates using each schedule type
+DEFAULT_MIX = {
+    'once'        : 0.1,
+    'weekly'      : 0.2,
+    'monthly'     : 0.4,
+    'everynweek'  : 0.2,
+    'everynmonth' : 0.1,
+}
+START_DATE = datetime.date(2020, 1, 1)
+
+
+def _schedule(schedule_type, rng, start, last):
+    """Random schedule of schedule_type with events between start and last."""
+    days = (last - start).days
+    if schedule_type == 'once':
+        return schedulers.Once(start + datetime.timedelta(rng.randrange(days + 1)))
+    if schedule_type == 'weekly':
+        return schedulers.Weekly(rng.randrange(7))
+    if schedule_type == 'monthly':
+        return schedulers.Monthly(rng.randint(1, 31))
+    # begin before the window, like most real repeating bills
+    first = start - datetime.timedelta(rng.randrange(365))
+    if schedule_type == 'everynweek':
+        return schedulers.EveryNWeek(first, rng.randint(1, 4))
+    if schedule_type == 'everynmonth':
+        return schedulers.EveryNMonth(first, rng.choice((1, 2, 3, 6, 12)))
+    raise ValueError("unknown schedule type {}".format(schedule_type))
+
+
+def synthetic_budget(num_templates=100, mix=None, exception_density=0.05,
+                     years=10, seed=0):
+    """Generate a budget in the standard dictionary storage format.
+
+    Parameters
+    -----
+    num_templates - number of template transactions
+    mix - dictionary of schedule type to the share of templates using it.
+        Defaults to DEFAULT_MIX.
+    exception_density - fraction of the scheduled events in the window which
+        have an exception amount
+    years - length of the forecast window in years
+    seed - seed for the random numbers, so a budget can be regenerated
+
+    Returns the budget dictionary.
+    """
+    rng = random.Random(seed)
+    mix = DEFAULT_MIX if mix is None else mix
+    types = list(mix)
+    duration = datetime.timedelta(days=round(365.25 * years))
+    last = START_DATE + duration - datetime.timedelta(1)
+
+    items = []
+    for index in range(num_templates):
+        schedule_type = rng.choices(types, weights=[mix[key] for key in types])[0]
+        schedule = _schedule(schedule_type, rng, START_DATE, last)
+        if rng.random() < 0.2:
+            amount = round(rng.uniform(500, 5000), 2)
+            category = 'income'
+        else:
+            amount = -round(rng.uniform(1, 500), 2)
+            category = rng.choice(('bill', 'food', 'travel', 'savings'))
+
+        exceptions = {}
+        for date in schedule.view(START_DATE, last):
+            if rng.random() < exception_density:
+                exceptions[date] = round(amount * rng.uniform(0.5, 1.5), 2)
+
+        template = TemplateTransaction('{}{}'.format(schedule_type, index),
+                                       category, amount, schedule, exceptions)
+        items.append(dict(template))
+
+    return {
+        'filetype': 'budgettool',
+        'version': 1,
+        'start_balance': 10000.0,
+        'start_date': date_to_str(START_DATE),
+        'duration': duration_to_dict(duration),
+        'budget': items,
+    }
@@ -0,0 +1,148 @@
+"""Save a forecast as fixed-width binary records which can be memory-mapped.
+
+The records go in a .npy file so they can be sliced without parsing text or
+reading the whole file. Names and categories are stored once in a json file
+next to it, and each record refers to them by id.
+"""
+import json
+
+import numpy as np
+
+from .forecast import ForecastEntry, ForecastResult
+from .transaction import Transaction
+
+RECORD_DTYPE = np.dtype([
+    ('date',     '<M8[D]'),
+    ('amount',   '<f8'),
+    ('balance',  '<f8'),
+    ('name',     '<i4'),
+    ('category', '<i4'),
+])
+_FORMAT_VERSION = 1
+
+
+def strings_filename(filename):
+    """Path of the json file holding the names and categories."""
+    return filename + '.json'
+
+
+def _intern(values):
+    """Ids for a sequence of strings, and the list of unique strings."""
+    ids = {}
+    out = [ids.setdefault(value, len(ids)) for value in values]
+    return np.array(out, dtype=np.int32), list(ids)
+
+
+def save_forecast_to_npy(forecast, filename):
+    """Save forecasted account balances as binary records.
+
+    Parameters
+    ========
+    forecast - any iterable of ForecastEntry, or a ForecastResult. Forecasts
+        in cents are saved in dollars.
+    filename - path of the .npy file. The names and categories are written
+        to strings_filename(filename).
+    """
+    if isinstance(forecast, ForecastResult):
+        forecast = forecast.in_dollars()
+        name_ids, names = _intern(
+            snapshot.transaction.name for snapshot in forecast.snapshots)
+        category_ids, categories = _intern(
+            snapshot.transaction.category for snapshot in forecast.snapshots)
+        records = np.empty(len(forecast), dtype=RECORD_DTYPE)
+        records['date'] = forecast.dates
+        records['amount'] = forecast.amounts
+        records['balance'] = forecast.balances
+        records['name'] = name_ids[forecast.template_index]
+        records['category'] = category_ids[forecast.template_index]
+    else:
+        entries = list(forecast)
+        records = np.empty(len(entries), dtype=RECORD_DTYPE)
+        records['date'] = [entry.date for entry in entries]
+        records['amount'] = [entry.transaction.amount for entry in entries]
+        records['balance'] = [entry.balance for entry in entries]
+        records['name'], names = _intern(
+            entry.transaction.name for entry in entries)
+        records['category'], categories = _intern(
+            entry.transaction.category for entry in entries)
+
+    with open(filename, 'wb') as out:
+        np.save(out, records, allow_pickle=False)
+    with open(strings_filename(filename), 'w') as out:
+        json.dump({'version': _FORMAT_VERSION,
+                   'names': names,
+                   'categories': categories}, out)
+
+
+class BinaryForecast:
+    """Forecast loaded from save_forecast_to_npy().
+
+    The records are memory-mapped, so only the parts which are used are read
+    from disk.
+
+    Attributes
+    -----
+    records - structured array with the fields of RECORD_DTYPE
+    names - list of transaction names, indexed by the name field
+    categories - list of categories, indexed by the category field
+    """
+    def __init__(self, records, names, categories):
+        self.records = records
+        self.names = names
+        self.categories = categories
+
+    @property
+    def dates(self):
+        return self.records['date']
+
+    @property
+    def amounts(self):
+        return self.records['amount']
+
+    @property
+    def balances(self):
+        return self.records['balance']
+
+    def between(self, start, end):
+        """The records dated from start to end, inclusive.
+
+        Found by binary search, so only a few pages are read for the lookup.
+        """
+        dates = self.records['date']
+        low = np.searchsorted(dates, np.datetime64(start, 'D'), side='left')
+        high = np.searchsorted(dates, np.datetime64(end, 'D'), side='right')
+        return BinaryForecast(self.records[low:high], self.names, self.categories)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return BinaryForecast(self.records[index], self.names, self.categories)
+        record = self.records[index]
+        return ForecastEntry(record['date'].item(),
+                             Transaction(self.names[record['name']],
+                                         self.categories[record['category']],
+                                         record['amount'].item()),
+                             record['balance'].item())
+
+    def __iter__(self):
+        for index in range(len(self.records)):
+            yield self[index]
+
+
+def load_forecast_npy(filename, mmap=True):
+    """Load a forecast saved by save_forecast_to_npy().
+
+    mmap - memory-map the records instead of reading them into memory.
+    """
+    with open(strings_filename(filename)) as infile:
+        strings = json.load(infile)
+    if strings['version'] != _FORMAT_VERSION:
+        raise ValueError("unsupported forecast file version {}".format(
+            strings['version']))
+    records = np.load(filename, mmap_mode='r' if mmap else None,
+                      allow_pickle=False)
+    if records.dtype != RECORD_DTYPE:
+        raise ValueError("{} does not hold forecast records".format(filename))
+    return BinaryForecast(records, strings['names'], strings['categories'])
@@ -1,34 +1,76 @@
-from . import forecast
+from .forecast import iter_forecast
+from . import montecarlo
+from .incremental import IncrementalForecast
+from .stats import timed
 from .transaction import TemplateTransaction
 from .fileutils import str_to_date, date_to_str, dict_to_duration, duration_to_dict, get_default
+from .fileutils import to_cents, cents_to_dollars
 
 class Budget:
     @staticmethod
-    def from_dict(data, filename=None):
+    def from_dict(data, filename=None, cents=False):
+        """Generate a Budget from the standard dictionary storage format.
+
+        cents - parse the amounts into integer cents, see Budget.
+        """
         assert data['filetype'] == 'budgettool'
         assert data['version'] == 1
         start_balance = data['start_balance']
+        if cents:
+            start_balance = to_cents(start_balance)
         start_date = get_default('start_date', data, None, str_to_date)
         duration = dict_to_duration(data['duration'])
-        budget = [ TemplateTransaction.from_dict(item) for item in data['budget'] ]
+        budget = [ TemplateTransaction.from_dict(item, cents) for item in data['budget'] ]
         return Budget(start_balance=start_balance,
                       start_date=start_date,
                       duration=duration,
                       budget=budget,
-                      filename=filename)
+                      filename=filename,
+                      cents=cents)
 
     def __init__(self, start_balance=None, start_date=None,
-                 duration=None, budget=[], filename=None):
+                 duration=None, budget=[], filename=None, cents=False):
+        """
+        cents - the start balance and the templates' amounts are integer
+            cents. The balances are then added up exactly and the forecasts
+            are converted to dollars when they are returned.
+        """
         self.filename=filename
         self.start_balance=start_balance
         self.start_date=start_date
         self.duration=duration
         self.budget=budget
+        self.cents=cents
+        # last forecast, kept up to date by add_item() and modify()
+        self._forecast = None
+
+    def _kept_forecast(self):
+        """The kept IncrementalForecast if it still fits this budget, otherwise
+        None. Attributes and templates may have been changed directly, so they
+        are all compared. Changed templates are updated in the kept forecast
+        and a changed start balance only shifts the balances.
+        """
+        kept = self._forecast
+        if (kept is None
+                or kept.start != self.start_date or kept.duration != self.duration
+                or not kept.update(self.budget)):
+            self._forecast = None
+            return None
+        if kept.starting_balance != self.start_balance:
+            kept.set_starting_balance(self.start_balance)
+        return kept
 
     def add_item(self, item):
+        self._kept_forecast()
         self.budget.append(item)
+        if self._forecast is not None:
+            self._forecast.append(item)
 
     def modify(self, **kwargs):
+        """Change some of start_balance, start_date, duration, budget and
+        filename. For a budget in cents start_balance is in integer cents, and
+        so are the amounts of the templates in budget.
+        """
         keys = ('start_balance', 'start_date', 'duration', 'budget', 'filename')
         for k, v in kwargs.items():
             if k in keys:
@@ -36,19 +78,77 @@ class Budget:
             else:
                 raise KeyError
 
-    def forecast(self):
-        """Generate a list of transactions and predicted balance from this budget."""
-        return forecast.forecast(
+        if self._forecast is None:
+            return
+        if 'start_date' in kwargs or 'duration' in kwargs:
+            self._forecast = None
+            return
+        if 'budget' in kwargs and not self._forecast.update(self.budget):
+            self._forecast = None
+            return
+        if 'start_balance' in kwargs:
+            self._forecast.set_starting_balance(self.start_balance)
+
+    def forecast(self, columnar=False, workers=None, stats=None):
+        """Generate a list of transactions and predicted balance from this budget.
+
+        If columnar is True a forecast.ForecastResult is returned instead.
+        If workers is more than 1 a large forecast is computed in up to that many
+        processes, each handling a range of dates.
+
+        The result is kept, and edits made through add_item() and modify() are
+        applied to it, so the next call only has to generate the occurrences of
+        the templates which changed. Templates added, removed or edited in
+        place directly are found by comparing them with the kept forecast.
+
+        stats - (optional) stats.ForecastStats to record the stages in. Nothing
+            is recorded when the kept forecast is reused.
+        """
+        if self._kept_forecast() is None:
+            self._forecast = IncrementalForecast(
+                self.start_balance,
+                self.budget,
+                self.start_date,
+                duration=self.duration,
+                workers=workers,
+                stats=stats)
+
+        result = self._forecast.result
+        if result.cents:
+            with timed(stats, 'dollars'):
+                result = result.in_dollars()
+        if columnar:
+            return result
+        with timed(stats, 'entries'):
+            return list(result)
+
+    def iter_forecast(self):
+        """Lazily generate the forecast of this budget one entry at a time."""
+        return iter_forecast(
             self.start_balance,
             self.budget,
             self.start_date,
             duration=self.duration)
 
+    def simulate(self, scenarios=1000, percentiles=(5, 50, 95), seed=None):
+        """Simulate this budget's balance for many scenarios of the uncertain
+        amounts. See montecarlo.simulate().
+        """
+        return montecarlo.simulate(
+            self.start_balance,
+            self.budget,
+            self.start_date,
+            duration=self.duration,
+            scenarios=scenarios,
+            percentiles=percentiles,
+            seed=seed)
+
     def __iter__(self):
         return iter((
             ('filetype',     'budgettool'),
             ('version',      1),
-            ('start_blance', self.start_balance),
+            ('start_blance', cents_to_dollars(self.start_balance)
+                             if self.cents else self.start_balance),
             ('start_date',   date_to_str(self.start_date)),
             ('duration',     duration_to_dict(self.duration)),
             ('budget',       [dict(item) for item in self.budget]),
@@ -1,16 +1,123 @@
 """File with top level helper to import a budget.
 """
+import collections
+import hashlib
+import os
+import pickle
+
 from . import jsonparser
 from . import budget
+from .stats import timed
+
+# bump when the pickled form of Budget changes to ignore old cache files
+_CACHE_VERSION = 5
+# number of parsed budgets kept in memory
+MEMORY_CACHE_SIZE = 128
+_memory_cache = collections.OrderedDict()
+
+
+def _cache_key(filename, cents=False):
+    """Key identifying the current contents of a budget file and how its
+    amounts are parsed."""
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    with open(path, 'rb') as infile:
+        digest = hashlib.sha256(infile.read()).hexdigest()
+    return (path, stat.st_size, stat.st_mtime_ns, digest, cents)
+
+
+def _cache_path(cache_dir, key):
+    name = hashlib.sha256(key[0].encode('utf-8')).hexdigest()
+    if key[-1]:
+        name += '-cents'
+    return os.path.join(cache_dir, name + '.pickle')
+
+
+def _load_cached(cache_dir, key):
+    """Pickled budget for key from memory or the cache directory, or None.
+
+    A budget loaded only once in this process is held as its decoded json
+    dictionary instead, see budget_from_json().
+    """
+    if key in _memory_cache:
+        _memory_cache.move_to_end(key)
+        return _memory_cache[key]
+    if cache_dir is None:
+        return None
+    try:
+        with open(_cache_path(cache_dir, key), 'rb') as infile:
+            version, cached_key, data = pickle.load(infile)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    if version != _CACHE_VERSION or cached_key != key:
+        return None
+    _remember(key, data)
+    return data
 
-def budget_from_json(filename):
+
+def _remember(key, data):
+    _memory_cache[key] = data
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+
+def _store_cached(cache_dir, key, data):
+    _remember(key, data)
+    if cache_dir is None:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, key)
+    # write then rename so readers never see a partial file
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as outfile:
+        pickle.dump((_CACHE_VERSION, key, data), outfile,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def clear_cache():
+    """Forget all budgets held in the in-process cache."""
+    _memory_cache.clear()
+
+
+def budget_from_json(filename, cache_dir=None, stats=None, cents=False):
     """Create a Budget object from a file.
 
+    Parsed budgets are cached in memory, keyed by the file's path, size,
+    modification time and a hash of its contents, so loading an unchanged
+    file again skips parsing. Every call returns a new Budget.
+
+    Without a cache_dir the first load only keeps the decoded json, so files
+    loaded once don't pay for pickling. The pickled budget is kept from the
+    second load on.
+
     Parameters
     =====
     filename - path to a json file with a budget
+    cache_dir - (optional) directory in which to also cache the parsed budget
+        between runs
+    stats - (optional) stats.ForecastStats to record the loading stages in
+    cents - parse the amounts into integer cents, see budget.Budget
     """
-    # note, if we start supporting multiple file encodings, we would add that here.
-    storage_dict = jsonparser.load(filename)
-    budget_obj = budget.Budget.from_dict(storage_dict, filename)
+    with timed(stats, 'cache lookup'):
+        key = _cache_key(filename, cents)
+        data = _load_cached(cache_dir, key)
+        if isinstance(data, bytes):
+            return pickle.loads(data)
+
+    if data is None:
+        # note, if we start supporting multiple file encodings, we would add that here.
+        with timed(stats, 'read'):
+            storage_dict = jsonparser.load(filename)
+    else:
+        storage_dict = data
+    with timed(stats, 'parse'):
+        budget_obj = budget.Budget.from_dict(storage_dict, filename, cents)
+    with timed(stats, 'cache store'):
+        if cache_dir is None and data is None:
+            _remember(key, storage_dict)
+        else:
+            _store_cached(cache_dir, key,
+                          pickle.dumps(budget_obj, protocol=pickle.HIGHEST_PROTOCOL))
     return budget_obj
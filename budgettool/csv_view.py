@@ -1,7 +1,34 @@
 """View for a generated forecast that prints out the transactions and balances as csv"""
+import gzip
 
+import numpy as np
 
-def save_forecast_to_csv(transactions, filename):
+from .forecast import ForecastResult
+
+_HEADER = 'date YYYY-MM-dd,name,amount,balance\n'
+_ROW_FORMAT = '%s,%s,$%.2f,$%.2f\n'
+# number of rows formatted and written at a time
+BATCH_SIZE = 65536
+_BUFFER_SIZE = 1 << 20
+
+
+def _open(filename, compress):
+    if compress is None:
+        compress = filename.endswith('.gz')
+    if compress:
+        return gzip.open(filename, 'wt', compresslevel=6)
+    return open(filename, 'w', buffering=_BUFFER_SIZE)
+
+
+def _write_rows(out, values):
+    """Write rows given as a flat list of (date, name, amount, balance) values.
+
+    The rows are formatted with one % operation rather than one per row.
+    """
+    out.write((_ROW_FORMAT * (len(values) // 4)) % tuple(values))
+
+
+def save_forecast_to_csv(transactions, filename, compress=None, batch_size=BATCH_SIZE):
     """Save forecasted account balances to a csv file.
 
     The file format is
@@ -9,17 +36,43 @@ def save_forecast_to_csv(transactions, filename):
 
     Parameters
     ========
-    transactions - list of ForecastEntry transactions.
+    transactions - any iterable of ForecastEntry, such as a list or the
+        generator from iter_forecast(), or a ForecastResult. Entries are
+        written as they arrive, batch_size at a time. Forecasts in cents
+        are written in dollars.
     filename - path to filename to write the values out.
+    compress - write gzip compressed csv. By default the file is compressed
+        if filename ends in .gz
+    batch_size - number of rows formatted and written at a time
     """
-    with open(filename, 'w') as out:
-        print('date YYYY-MM-dd,name,amount,balance', file=out)
+    with _open(filename, compress) as out:
+        out.write(_HEADER)
 
+        if isinstance(transactions, ForecastResult):
+            _write_columns(transactions.in_dollars(), out, batch_size)
+            return
+
+        values = []
         for entry in transactions:
-            print(
-                "{},{},${:.2f},${:.2f}".format(
-                    entry.date.isoformat(),
-                    entry.transaction.name,
-                    entry.transaction.amount,
-                    entry.balance),
-                file=out)
+            values += (entry.date.isoformat(),
+                       entry.transaction.name,
+                       entry.transaction.amount,
+                       entry.balance)
+            if len(values) >= 4 * batch_size:
+                _write_rows(out, values)
+                values = []
+        _write_rows(out, values)
+
+
+def _write_columns(result, out, batch_size):
+    """Write the rows of a ForecastResult straight from its columns."""
+    names = np.array([snapshot.transaction.name for snapshot in result.snapshots],
+                     dtype=object)
+    for low in range(0, len(result), batch_size):
+        high = min(low + batch_size, len(result))
+        block = np.empty((high - low, 4), dtype=object)
+        block[:, 0] = np.datetime_as_string(result.dates[low:high], unit='D')
+        block[:, 1] = names[result.template_index[low:high]]
+        block[:, 2] = result.amounts[low:high].tolist()
+        block[:, 3] = result.balances[low:high].tolist()
+        _write_rows(out, block.ravel().tolist())
@@ -0,0 +1,92 @@
+"""Distributions describing how uncertain the amount of a transaction is.
+
+Used by montecarlo.simulate() to draw many possible amounts at once.
+"""
+
+
+class Normal:
+    """Normally distributed around the transaction's amount."""
+
+    distribution_type = 'normal'
+
+    def __init__(self, stddev):
+        """
+        Params
+        ------
+        stddev - standard deviation of the amount
+        """
+        self.stddev = stddev
+
+    def sample(self, rng, amounts, shape):
+        """Draw amounts.
+
+        Parameters
+        -----
+        rng - numpy.random.Generator
+        amounts - the scheduled amounts, broadcast against shape
+        shape - shape of the array to return
+        """
+        return rng.normal(amounts, self.stddev, shape)
+
+    @staticmethod
+    def from_dict(data):
+        """Generate a Normal distribution from the standard dictionary storage format.
+        """
+        return Normal(float(data['stddev']))
+
+    def __iter__(self):
+        return iter((
+            ('stddev', self.stddev),
+        ))
+
+
+class Range:
+    """Uniformly distributed between two amounts, whatever the scheduled
+    amount is.
+    """
+
+    distribution_type = 'range'
+
+    def __init__(self, low, high):
+        """
+        Params
+        ------
+        low - smallest possible amount
+        high - largest possible amount
+        """
+        self.low = low
+        self.high = high
+
+    def sample(self, rng, amounts, shape):
+        """Draw amounts.
+
+        Parameters
+        -----
+        rng - numpy.random.Generator
+        amounts - the scheduled amounts, which are ignored
+        shape - shape of the array to return
+        """
+        return rng.uniform(self.low, self.high, shape)
+
+    @staticmethod
+    def from_dict(data):
+        """Generate a Range distribution from the standard dictionary storage format.
+        """
+        return Range(float(data['low']), float(data['high']))
+
+    def __iter__(self):
+        return iter((
+            ('low',  self.low),
+            ('high', self.high),
+        ))
+
+
+def from_dict(distribution):
+    """Return a distribution based on the description in the provided dictionary.
+
+    distribution - a dictionary using the standard storage format.
+    """
+    return {
+        'normal' : Normal,
+        'range'  : Range,
+    }[distribution['type'].lower()].from_dict(distribution['data'])
@@ -1,12 +1,35 @@
 import datetime
+import decimal
+import functools
 
+# English month names, so parsing doesn't depend on the locale
+_MONTH_NAMES = ('', 'January', 'February', 'March', 'April', 'May', 'June',
+                'July', 'August', 'September', 'October', 'November', 'December')
+_MONTH_NUMBERS = {name.lower(): number
+                  for number, name in enumerate(_MONTH_NAMES) if name}
+
+def _is_number(text):
+    return text.isascii() and text.isdigit()
+
+@functools.lru_cache(maxsize=65536)
 def str_to_date(datestr):
-    """Convert a string into a datetime.date"""
-    #TODO: expand this to support other formats automatically?
+    """Convert a string into a datetime.date
+
+    Accepts '28 July 2016' and ISO '2016-07-28'. Repeated strings are
+    memoized.
+    """
+    parts = datestr.split()
+    if len(parts) == 3:
+        day, month, year = parts
+        month_number = _MONTH_NUMBERS.get(month.lower())
+        if month_number and _is_number(day) and _is_number(year):
+            return datetime.date(int(year), month_number, int(day))
+    elif len(datestr) == 10 and datestr[4] == '-' and datestr[7] == '-':
+        return datetime.date.fromisoformat(datestr)
     return datetime.datetime.strptime(datestr, '%d %B %Y').date()
 
 def date_to_str(date):
-    return date.strftime('%d %B %Y')
+    return '{:02d} {} {}'.format(date.day, _MONTH_NAMES[date.month], date.year)
 
 def str_to_weekday(daystr):
     try:
@@ -32,6 +55,18 @@ def str_to_weekday(daystr):
 def weekday_to_str(weekday):
     return ('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')[weekday]
 
+def to_cents(amount):
+    """Convert an amount in dollars to an integer number of cents.
+
+    Goes through the shortest repr of the float, so an amount written with two
+    decimals converts exactly instead of picking up binary rounding error.
+    """
+    cents = decimal.Decimal(repr(amount)).scaleb(2)
+    return int(cents.to_integral_value(decimal.ROUND_HALF_EVEN))
+
+def cents_to_dollars(cents):
+    return cents / 100
+
 def dict_to_duration(data):
     return datetime.timedelta(**data)
 
@@ -1,4 +1,33 @@
 """Predict future balances and transactions."""
+import bisect
+import collections
+import concurrent.futures
+import datetime
+import heapq
+import os
+import time
+
+import numpy as np
+
+from .transaction import Transaction
+from .stats import timed
+
+
+Rollup = collections.namedtuple("Rollup", ["income", "expense"])
+
+_PERIOD_MONTHS = {
+    'month'   : 1,
+    'quarter' : 3,
+    'year'    : 12,
+}
+
+
+# shards with fewer entries than this cost more to start a process for than
+# they save; one process forecasts several million entries a second, see
+# benchmarks.bench_shards
+MIN_SHARD_ENTRIES = 1000000
+
+
 class ForecastEntry:
     """Transaction at a specific date in a forecast."""
     def __init__(self, date, transaction, balance):
@@ -15,23 +44,405 @@ class ForecastEntry:
             self.date, self.transaction, self.balance)
 
 
-def forecast(starting_balance, transactions, start, end=None, duration=None):
+def window_end(start, end=None, duration=None):
+    """Last day of a window given either its end or its duration."""
+    if end is not None:
+        return end
+    if duration is None:
+        raise ValueError("No end specified")
+    return start + duration - datetime.timedelta(1)
+
+
+def amount_dtype(transactions):
+    """numpy type of the amounts of a forecast of transactions.
+
+    int64 if the templates are in cents, see TemplateTransaction. Raises
+    ValueError if templates in cents and in dollars are mixed.
+    """
+    kinds = set(template.cents for template in transactions)
+    if len(kinds) > 1:
+        raise ValueError("templates in cents and in dollars can't be forecast together")
+    return np.int64 if kinds == {True} else np.float64
+
+
+def _expand_templates(transactions, start, end=None, duration=None, subrange=None,
+                      stats=None):
+    """Expand templates into (dates, template indexes, amounts) arrays sorted
+    by date. Entries on the same day are in template order.
+
+    subrange - (optional) (first, last) dates. Only expand this part of the
+        window.
+    stats - (optional) ForecastStats to record the time of each template in
+    """
+    dates = [np.array([], dtype='datetime64[D]')]
+    amounts = [np.array([], dtype=amount_dtype(transactions))]
+    indexes = [np.array([], dtype=np.intp)]
+    with timed(stats, 'expand'):
+        for index, template in enumerate(transactions):
+            started = time.perf_counter()
+            template_dates, template_amounts = template.view_array(
+                start, end, duration, subrange)
+            if stats is not None:
+                stats.add_template_time(template, time.perf_counter() - started)
+            dates.append(template_dates)
+            amounts.append(template_amounts)
+            indexes.append(np.full(len(template_dates), index, dtype=np.intp))
+
+        dates = np.concatenate(dates)
+        amounts = np.concatenate(amounts)
+        indexes = np.concatenate(indexes)
+
+    with timed(stats, 'sort'):
+        # stable so same day entries stay in template order
+        order = np.argsort(dates, kind='stable')
+        return dates[order], indexes[order], amounts[order]
+
+
+def _expand_shard(job):
+    """_expand_templates() for one shard, run in a worker process."""
+    return _expand_templates(*job)
+
+
+def _shards(transactions, start, last, workers):
+    """Split a window into date shards for worker processes.
+
+    Returns a list of (positions, (first, last)) with the window of each shard
+    and the positions in transactions of the templates with an occurrence in
+    it. Shards without any occurrences are left out. The list is empty if the
+    forecast is better computed in this process: with one cpu or worker, or
+    a window too short for MIN_SHARD_ENTRIES entries per shard.
+    """
+    if workers is None or workers <= 1 or (os.cpu_count() or 1) <= 1:
+        return []
+    views = [template.schedule.view(start, last) for template in transactions]
+    count = min(workers, sum(len(view) for view in views) // MIN_SHARD_ENTRIES)
+    if count <= 1:
+        return []
+    days = (last - start).days + 1
+    shard_days = -(-days // count)
+    shards = []
+    shard_start = start
+    while shard_start <= last:
+        shard_end = min(last, shard_start + datetime.timedelta(shard_days - 1))
+        after_end = shard_end + datetime.timedelta(1)
+        positions = [position for position, view in enumerate(views)
+                     if view.index_on_or_after(shard_start)
+                     < view.index_on_or_after(after_end)]
+        if positions:
+            shards.append((np.array(positions, dtype=np.intp),
+                           (shard_start, shard_end)))
+        shard_start = after_end
+    return shards
+
+
+class ForecastResult:
+    """Forecast stored as parallel arrays instead of a list of ForecastEntry.
+
+    Attributes
+    -----
+    templates - list of the TemplateTransactions the forecast was made from
+    snapshots - TemplateSnapshot of each template taken when the forecast
+        was made. Entries are built from these, so templates edited in place
+        afterwards don't change the forecast.
+    dates - datetime64[D] array with the date of each entry
+    template_index - index into templates of each entry
+    amounts - array with the amount of each entry
+    balances - array with the balance after each entry
+
+    Iterating or indexing returns ForecastEntry objects, so this can be used
+    anywhere the list returned by forecast() is used.
+
+    The amounts and balances are float64 dollars, or int64 cents if the
+    templates are in cents. in_dollars() converts the latter for output.
+    """
+    def __init__(self, templates, dates, template_index, amounts, balances,
+                 snapshots=None):
+        """snapshots - (optional) the templates' snapshots, taken now if None."""
+        self.templates = templates
+        self.dates = dates
+        self.template_index = template_index
+        self.amounts = amounts
+        self.balances = balances
+        if snapshots is None:
+            snapshots = [template.snapshot() for template in templates]
+        self.snapshots = snapshots
+
+    @staticmethod
+    def from_templates(starting_balance, transactions, start, end=None, duration=None,
+                       workers=None, stats=None):
+        """Compute the forecast of a list of TemplateTransactions.
+
+        If workers is more than 1, the window is split into up to that many
+        date shards which are expanded and sorted in separate processes. Each
+        process is only sent the templates with occurrences in its shard. The
+        forecast is computed in this process if there is only one cpu or the
+        window is too short to be worth it, see MIN_SHARD_ENTRIES.
+
+        stats - (optional) ForecastStats to record the stages in. With
+            several workers, expanding and sorting is one 'expand' stage.
+        """
+        transactions = list(transactions)
+        snapshots = [template.snapshot() for template in transactions]
+        shards = []
+        if workers is not None and workers > 1:
+            last = window_end(start, end, duration)
+            shards = _shards(transactions, start, last, workers)
+
+        if len(shards) > 1:
+            # the shards only see some of the templates, so check them all
+            amount_dtype(transactions)
+            with timed(stats, 'expand'):
+                jobs = [([transactions[position] for position in positions],
+                         start, last, None, window)
+                        for positions, window in shards]
+                with concurrent.futures.ProcessPoolExecutor(len(jobs)) as pool:
+                    parts = list(pool.map(_expand_shard, jobs))
+                # workers number the templates they were sent
+                dates = np.concatenate([part[0] for part in parts])
+                indexes = np.concatenate([positions[part[1]] for (positions, _), part
+                                          in zip(shards, parts)])
+                amounts = np.concatenate([part[2] for part in parts])
+        else:
+            dates, indexes, amounts = _expand_templates(transactions, start, end,
+                                                        duration, stats=stats)
+
+        with timed(stats, 'balance'):
+            # accumulate from the starting balance so the rounding matches
+            # adding one entry at a time
+            balances = np.cumsum(np.concatenate(([starting_balance], amounts)))[1:]
+
+        result = ForecastResult(transactions, dates, indexes, amounts, balances,
+                                snapshots)
+        if stats is not None:
+            stats.add_result(result)
+        return result
+
+    @property
+    def cents(self):
+        """True if the amounts and balances are integer cents."""
+        return self.amounts.dtype.kind == 'i'
+
+    def in_dollars(self):
+        """This forecast with the amounts and balances in dollars.
+
+        The balances were added up exactly in cents, so each one is the float
+        closest to the true balance. Returns the forecast itself if it is
+        already in dollars.
+        """
+        if not self.cents:
+            return self
+        return ForecastResult(self.templates,
+                              self.dates,
+                              self.template_index,
+                              self.amounts / 100,
+                              self.balances / 100,
+                              [snapshot.in_dollars() for snapshot in self.snapshots])
+
+    def transaction(self, index):
+        """The Transaction for the entry at index."""
+        snapshot = self.snapshots[self.template_index[index]]
+        date = self.dates[index].item()
+        if date in snapshot.exceptions:
+            return Transaction(snapshot.transaction.name,
+                               snapshot.transaction.category,
+                               snapshot.exceptions[date])
+        return snapshot.transaction
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ForecastResult(self.templates,
+                                  self.dates[index],
+                                  self.template_index[index],
+                                  self.amounts[index],
+                                  self.balances[index],
+                                  self.snapshots)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("forecast index out of range")
+        return ForecastEntry(self.dates[index].item(),
+                             self.transaction(index),
+                             self.balances[index].item())
+
+    def __iter__(self):
+        for date, index, balance in zip(self.dates.tolist(),
+                                        self.template_index.tolist(),
+                                        self.balances.tolist()):
+            snapshot = self.snapshots[index]
+            transaction = snapshot.transaction
+            if date in snapshot.exceptions:
+                transaction = Transaction(transaction.name,
+                                          transaction.category,
+                                          snapshot.exceptions[date])
+            yield ForecastEntry(date, transaction, balance)
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+
+def forecast(starting_balance, transactions, start, end=None, duration=None,
+             columnar=False, workers=None, stats=None):
     """Take a starting balance and a list of TemplateTransactions and compute
     the future balances.
+
+    Returns a list of ForecastEntry, or a ForecastResult if columnar is True.
+
+    If workers is more than 1, large forecasts are split into date shards
+    which are computed in up to that many processes. See
+    ForecastResult.from_templates().
+
+    If the templates are in cents, the starting balance must be too. The
+    balances are added up exactly as integers and returned in dollars.
+
+    stats - (optional) stats.ForecastStats to record the time of each stage
+        and the entries of each template in.
     """
+    transactions = list(transactions)
+    cents = amount_dtype(transactions) == np.int64
+    if columnar or cents or (workers is not None and workers > 1):
+        result = ForecastResult.from_templates(
+            starting_balance, transactions, start, end, duration, workers, stats)
+        if cents:
+            with timed(stats, 'dollars'):
+                result = result.in_dollars()
+        if columnar:
+            return result
+        with timed(stats, 'entries'):
+            return list(result)
+
     # generate all entries
-    entries = [
-        ForecastEntry(date, transaction, 0)
-        for template in transactions
-        for date, transaction in template.view(start, end, duration)]
+    entries = []
+    with timed(stats, 'expand'):
+        for template in transactions:
+            started = time.perf_counter()
+            count = len(entries)
+            entries.extend(ForecastEntry(date, transaction, 0)
+                           for date, transaction in template.view(start, end, duration))
+            if stats is not None:
+                stats.add_template_time(template, time.perf_counter() - started)
+                stats.add_events(template, len(entries) - count)
+    if stats is not None:
+        stats.held_entries(len(entries))
 
     # sort by date
-    entries = sorted(entries, key=lambda entry: entry.date)
+    with timed(stats, 'sort'):
+        entries = sorted(entries, key=lambda entry: entry.date)
 
     # compute the balance
-    balance = starting_balance
-    for entry in entries:
-        entry.balance = balance + entry.transaction.amount
-        balance = entry.balance
+    with timed(stats, 'balance'):
+        balance = starting_balance
+        for entry in entries:
+            entry.balance = balance + entry.transaction.amount
+            balance = entry.balance
 
     return entries
+
+
+def iter_forecast(starting_balance, transactions, start, end=None, duration=None):
+    """Generator version of forecast().
+
+    Each template's view is already in date order, so the views are merged
+    lazily and entries are yielded with their running balance as soon as they
+    are known. Only one pending date per template is held in memory. Entries
+    on the same date come out in template order, the same as forecast().
+
+    Templates in cents are added up exactly and each entry is converted to
+    dollars as it is yielded.
+    """
+    transactions = list(transactions)
+    cents = amount_dtype(transactions) == np.int64
+    views = [template.view(start, end, duration) for template in transactions]
+
+    balance = starting_balance
+    for date, transaction in heapq.merge(*views, key=lambda item: item[0]):
+        balance = balance + transaction.amount
+        if cents:
+            yield ForecastEntry(date,
+                                transaction._replace(amount=transaction.amount / 100),
+                                balance / 100)
+        else:
+            yield ForecastEntry(date, transaction, balance)
+
+
+def _period_starts(start, end, period):
+    """First day of each period which overlaps [start, end]."""
+    if period == 'day':
+        for day in range((end - start).days + 1):
+            yield start + datetime.timedelta(day)
+        return
+    months = _PERIOD_MONTHS[period]
+    month = (start.year * 12 + start.month - 1) // months * months
+    period_start = datetime.date(month // 12, month % 12 + 1, 1)
+    while period_start <= end:
+        yield period_start
+        month += months
+        period_start = datetime.date(month // 12, month % 12 + 1, 1)
+
+
+def rollup(transactions, start, end=None, duration=None, period='month'):
+    """Total income and expenses per period and category within a window.
+
+    The totals are computed from each schedule's occurrence count, so the
+    individual transactions are never generated.
+
+    Parameters
+    -----
+    transactions - list of TemplateTransactions
+    start - start of the window
+    end - (optional) the last day in the window
+    duration - (optional) the length of the window as a timedelta.
+    period - 'day', 'month', 'quarter' or 'year'
+
+    Returns a dictionary mapping (first day of period, category) to a
+    Rollup(income, expense). Expenses are negative. Only periods and categories
+    with at least one transaction are included. Totals of templates in cents
+    are added up exactly and returned in dollars.
+    """
+    transactions = list(transactions)
+    end = window_end(start, end, duration)
+
+    period_starts = list(_period_starts(start, end, period))
+    # each period is counted as the half open window up to the next one
+    next_starts = period_starts[1:] + [end + datetime.timedelta(1)]
+
+    totals = {}
+    def add(period_start, category, amount, income):
+        key = (period_start, category)
+        rolled = totals.get(key, Rollup(0, 0))
+        if income:
+            totals[key] = rolled._replace(income=rolled.income + amount)
+        else:
+            totals[key] = rolled._replace(expense=rolled.expense + amount)
+
+    for template in transactions:
+        amount = template.transaction.amount
+        category = template.transaction.category
+
+        # periods are positions in the view of the whole window, so they add
+        # up to exactly the transactions generated for it
+        schedule_view = template.schedule.view(start, end)
+        first = 0
+        for period_start, next_start in zip(period_starts, next_starts):
+            after = schedule_view.index_on_or_after(next_start)
+            if after != first:
+                add(period_start, category, (after - first) * amount, amount > 0)
+            first = after
+
+        if template.exceptions:
+            for date, except_amount in template.exceptions.items():
+                if date in schedule_view:
+                    period_start = period_starts[
+                        bisect.bisect_right(period_starts, date) - 1]
+                    add(period_start, category, -amount, amount > 0)
+                    add(period_start, category, except_amount, except_amount > 0)
+
+    if amount_dtype(transactions) == np.int64:
+        totals = {key: Rollup(rolled.income / 100, rolled.expense / 100)
+                  for key, rolled in totals.items()}
+    return dict(sorted(totals.items()))
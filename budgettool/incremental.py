@@ -0,0 +1,157 @@
+"""Forecast that can be updated in place when templates are added or removed.
+
+Only the occurrences of the edited template are generated; the other
+templates' entries are reused and the balances are recomputed from the first
+affected entry onwards.
+"""
+import numpy as np
+
+from .forecast import ForecastResult
+
+
+class IncrementalForecast:
+    """Keep a ForecastResult up to date as the list of templates is edited.
+
+    The current forecast is always available as `result`. Each edit replaces it
+    with a new ForecastResult, so results handed out earlier are not changed.
+    """
+    def __init__(self, starting_balance, templates, start, end=None, duration=None,
+                 workers=None, stats=None):
+        """Compute the initial forecast.
+
+        workers - the number of processes to expand it in, see
+            ForecastResult.from_templates().
+        stats - (optional) stats.ForecastStats to record the computation in
+        """
+        self.starting_balance = starting_balance
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.result = ForecastResult.from_templates(
+            starting_balance, templates, start, end, duration, workers, stats)
+
+    @property
+    def templates(self):
+        """The templates the current forecast was computed from."""
+        return self.result.templates
+
+    def matches(self, templates):
+        """True if the forecast was computed from exactly these templates, and
+        none of them has been edited in place since.
+        """
+        return (len(templates) == len(self.templates)
+                and all(a is b and snapshot.matches(a) for a, b, snapshot
+                        in zip(templates, self.templates, self.result.snapshots)))
+
+    def insert(self, position, template):
+        """Add the occurrences of a template inserted at position in the list."""
+        result = self.result
+        if result.templates and template.cents != result.cents:
+            raise ValueError("templates in cents and in dollars can't be forecast together")
+        dates, amounts = template.view_array(self.start, self.end, self.duration)
+
+        template_index = result.template_index.copy()
+        template_index[template_index >= position] += 1
+
+        # entries on the same day are ordered by template position
+        stride = len(result.templates) + 1
+        keys = result.dates.astype(np.int64) * stride + template_index
+        new_keys = dates.astype(np.int64) * stride + position
+        slots = np.searchsorted(keys, new_keys)
+
+        templates = list(result.templates)
+        templates.insert(position, template)
+        snapshots = list(result.snapshots)
+        snapshots.insert(position, template.snapshot())
+        self._update(
+            templates,
+            snapshots,
+            np.insert(result.dates, slots, dates),
+            np.insert(template_index, slots, position),
+            np.insert(result.amounts, slots, amounts),
+            slots[0] if len(slots) else None)
+
+    def append(self, template):
+        """Add the occurrences of a template added to the end of the list."""
+        self.insert(len(self.templates), template)
+
+    def remove(self, position):
+        """Remove the occurrences of the template at position in the list."""
+        result = self.result
+        keep = result.template_index != position
+        removed = np.flatnonzero(~keep)
+
+        template_index = result.template_index[keep]
+        template_index[template_index > position] -= 1
+
+        templates = list(result.templates)
+        del templates[position]
+        snapshots = list(result.snapshots)
+        del snapshots[position]
+        self._update(
+            templates,
+            snapshots,
+            result.dates[keep],
+            template_index,
+            result.amounts[keep],
+            removed[0] if len(removed) else None)
+
+    def update(self, templates):
+        """Bring the forecast up to date with a new list of templates.
+
+        Templates are matched by identity. Templates which were dropped are
+        removed, new ones are inserted and ones edited in place are inserted
+        again. Returns False, without changing
+        anything, if the surviving templates were reordered or a template is
+        listed twice; the forecast must then be rebuilt.
+        """
+        templates = list(templates)
+        new_ids = set(id(template) for template in templates)
+        if len(new_ids) != len(templates):
+            return False
+        old_ids = set(id(template) for template in self.templates)
+        if len(old_ids) != len(self.templates):
+            return False
+
+        kept = [template for template in self.templates if id(template) in new_ids]
+        if kept != [template for template in templates if id(template) in old_ids]:
+            return False
+
+        for position in reversed(range(len(self.templates))):
+            if id(self.templates[position]) not in new_ids:
+                self.remove(position)
+        for position, template in enumerate(templates):
+            if id(template) not in old_ids:
+                self.insert(position, template)
+            elif not self.result.snapshots[position].matches(template):
+                self.remove(position)
+                self.insert(position, template)
+        return True
+
+    def set_starting_balance(self, starting_balance):
+        """Change the starting balance and shift all the balances."""
+        self.starting_balance = starting_balance
+        result = self.result
+        self.result = ForecastResult(result.templates,
+                                     result.dates,
+                                     result.template_index,
+                                     result.amounts,
+                                     self._balances(result.balances,
+                                                    result.amounts, 0),
+                                     result.snapshots)
+
+    def _update(self, templates, snapshots, dates, template_index, amounts, first):
+        """Replace the result, recomputing balances from index first onwards.
+        first is None if no entries were added or removed.
+        """
+        balances = self.result.balances
+        if first is not None:
+            balances = self._balances(balances, amounts, first)
+        self.result = ForecastResult(templates, dates, template_index,
+                                     amounts, balances, snapshots)
+
+    def _balances(self, balances, amounts, first):
+        """New balance column which reuses balances before index first."""
+        previous = balances[first - 1] if first else self.starting_balance
+        tail = np.cumsum(np.concatenate(([previous], amounts[first:])))[1:]
+        return np.concatenate((balances[:first], tail))
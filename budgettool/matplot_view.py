@@ -1,14 +1,117 @@
 """Plot graph of forecast."""
-import matplotlib.pyplot as plt
 import numpy as np
 
-def plot_forecast(forecast):
-    """Plot a graph of the forecast."""
-    
-    x_values = np.array([entry.date for entry in forecast])
-    y_values = np.array([entry.balance for entry in forecast])
+from .forecast import ForecastResult
+
+# width in pixels of charts saved by render_forecast()
+RENDER_WIDTH = 1200
+RENDER_HEIGHT = 600
+RENDER_DPI = 100
+
+
+def _columns(forecast):
+    """datetime64[D] dates and float balances of a forecast."""
+    if isinstance(forecast, ForecastResult):
+        forecast = forecast.in_dollars()
+        return forecast.dates, forecast.balances
+    entries = list(forecast)
+    return (np.array([entry.date for entry in entries], dtype='datetime64[D]'),
+            np.array([entry.balance for entry in entries], dtype=np.float64))
+
+
+def decimate(dates, balances, buckets):
+    """Indexes of the points to draw so the chart keeps its shape.
+
+    The dates are split into equal time buckets, roughly one per pixel. In
+    each bucket the first, lowest, highest and last balances are kept, so
+    every dip and peak is still drawn and the step between buckets lines up.
+
+    Parameters
+    -----
+    dates - sorted datetime64 array
+    balances - array of the balance after each date
+    buckets - number of buckets. Forecasts with at most 4 points per bucket
+        are returned whole.
+
+    Returns a sorted array of indexes into dates and balances.
+    """
+    num_points = len(dates)
+    if num_points <= 4 * buckets:
+        return np.arange(num_points)
+
+    days = (dates - dates[0]).astype(np.int64)
+    bucket = days * buckets // (days[-1] + 1)
+
+    is_start = np.concatenate(([True], bucket[1:] != bucket[:-1]))
+    starts = np.flatnonzero(is_start)
+    ends = np.concatenate((starts[1:], [num_points])) - 1
+    # the buckets are already in order, so each one is a run of points and
+    # its extremes are found in one pass without sorting
+    run = np.cumsum(is_start) - 1
+    lows = _first_in_run(balances == np.minimum.reduceat(balances, starts)[run], run)
+    highs = _first_in_run(balances == np.maximum.reduceat(balances, starts)[run], run)
+    keep = np.concatenate((starts, ends, lows, highs))
+    return np.unique(keep)
+
+
+def _first_in_run(mask, run):
+    """Index of the first True in mask for each run, given the nondecreasing
+    run number of each point. Every run must have one.
+    """
+    hits = np.flatnonzero(mask)
+    hit_runs = run[hits]
+    return hits[np.concatenate(([True], hit_runs[1:] != hit_runs[:-1]))]
+
+
+def _draw(axes, dates, balances):
+    """Draw the balance as a step function which holds until the next date."""
+    axes.step(dates, balances, where='post')
+    axes.grid()
+
+
+def plot_forecast(forecast, buckets=None):
+    """Plot a graph of the forecast.
+
+    forecast - list of ForecastEntry or a ForecastResult.
+    buckets - (optional) decimate the points to this many buckets, see
+        decimate().
+    """
+    # pyplot picks an interactive backend, so only import it when plotting
+    import matplotlib.pyplot as plt
+
+    dates, balances = _columns(forecast)
+    if buckets is not None:
+        keep = decimate(dates, balances, buckets)
+        dates, balances = dates[keep], balances[keep]
     figure = plt.figure()
-    plt.plot(x_values, y_values)
+    _draw(figure.gca(), dates, balances)
     figure.autofmt_xdate()
-    plt.grid()
     plt.show()
+
+
+def render_forecast(forecast, filename, width=RENDER_WIDTH, height=RENDER_HEIGHT,
+                    dpi=RENDER_DPI):
+    """Save a graph of the forecast to an image file without a display.
+
+    The figure is drawn with the Agg renderer and not registered with pyplot,
+    so this can be called from batch workers and threads. The points are
+    decimated to about two buckets per pixel across.
+
+    Parameters
+    -----
+    forecast - list of ForecastEntry or a ForecastResult.
+    filename - path of the image. The format comes from the extension, such
+        as .png or .svg.
+    width, height - size of the image in pixels
+    dpi - dots per inch of the image
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    dates, balances = _columns(forecast)
+    keep = decimate(dates, balances, 2 * width)
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+    _draw(figure.add_subplot(), dates[keep], balances[keep])
+    figure.autofmt_xdate()
+    figure.savefig(filename)
@@ -0,0 +1,118 @@
+"""Simulate many possible futures for templates with uncertain amounts.
+
+The schedules are expanded once. The amounts of every scenario are then drawn
+together as a (scenarios x entries) matrix and all the balance paths come
+from one cumulative sum along the entries.
+"""
+import numpy as np
+
+from .forecast import ForecastResult
+
+# upper bound on the number of values in the matrix of amounts at one time
+_MAX_BLOCK_VALUES = 1 << 22
+
+
+class SimulationResult:
+    """Summary of simulated balances at the end of each date with a transaction.
+
+    Attributes
+    -----
+    dates - datetime64[D] array of the dates
+    percentiles - dictionary of percentile to an array of balances
+    mean - array with the mean balance
+    overdraft_probability - array with the fraction of scenarios in which the
+        balance is below zero at the end of the date
+    scenarios - number of scenarios simulated
+    """
+    def __init__(self, dates, percentiles, mean, overdraft_probability, scenarios):
+        self.dates = dates
+        self.percentiles = percentiles
+        self.mean = mean
+        self.overdraft_probability = overdraft_probability
+        self.scenarios = scenarios
+
+    def __len__(self):
+        return len(self.dates)
+
+
+def _uncertain_entries(result):
+    """Columns of the forecast whose amount must be drawn, with their
+    distribution. Exceptions are exact, so they are left out.
+    """
+    uncertain = []
+    for index, (template, snapshot) in enumerate(zip(result.templates,
+                                                     result.snapshots)):
+        if template.distribution is None:
+            continue
+        columns = result.template_index == index
+        if snapshot.exceptions:
+            except_dates = np.array(list(snapshot.exceptions),
+                                    dtype='datetime64[D]')
+            columns &= ~np.isin(result.dates, except_dates)
+        uncertain.append((np.flatnonzero(columns), template.distribution))
+    return uncertain
+
+
+def simulate(starting_balance, transactions, start, end=None, duration=None,
+             scenarios=1000, percentiles=(5, 50, 95), seed=None):
+    """Simulate the balance for many scenarios of the uncertain amounts.
+
+    Parameters
+    -----
+    starting_balance - balance before the first transaction
+    transactions - list of TemplateTransactions
+    start - start of the window
+    end - (optional) the last day in the window
+    duration - (optional) the length of the window as a timedelta.
+    scenarios - number of scenarios to simulate
+    percentiles - percentiles of the balance to report for each date
+    seed - (optional) seed for the random numbers
+
+    Returns a SimulationResult.
+    """
+    result = ForecastResult.from_templates(starting_balance, transactions,
+                                           start, end, duration)
+    if result.cents:
+        # the distributions are in dollars
+        starting_balance = starting_balance / 100
+        result = result.in_dollars()
+    uncertain = _uncertain_entries(result)
+    rng = np.random.default_rng(seed)
+
+    # the balance at the end of a date is the one after its last entry
+    num_entries = len(result)
+    is_last = np.ones(num_entries, dtype=bool)
+    is_last[:-1] = result.dates[1:] != result.dates[:-1]
+    last_of_date = np.flatnonzero(is_last)
+
+    bands = {percentile: np.empty(len(last_of_date)) for percentile in percentiles}
+    mean = np.empty(len(last_of_date))
+    overdraft = np.empty(len(last_of_date))
+
+    # work through the entries in blocks to bound the memory used
+    block_size = max(1, _MAX_BLOCK_VALUES // scenarios)
+    carry = np.full(scenarios, starting_balance, dtype=np.float64)
+    done = 0
+    for low in range(0, num_entries, block_size):
+        high = min(low + block_size, num_entries)
+        block = np.tile(result.amounts[low:high], (scenarios, 1))
+        for columns, distribution in uncertain:
+            columns = columns[(columns >= low) & (columns < high)] - low
+            if len(columns):
+                block[:, columns] = distribution.sample(
+                    rng, block[0, columns], (scenarios, len(columns)))
+        np.cumsum(block, axis=1, out=block)
+        block += carry[:, np.newaxis]
+        carry = block[:, -1].copy()
+
+        ends = last_of_date[done:np.searchsorted(last_of_date, high)]
+        balances = block[:, ends - low]
+        stop = done + len(ends)
+        for percentile in percentiles:
+            bands[percentile][done:stop] = np.percentile(balances, percentile, axis=0)
+        mean[done:stop] = balances.mean(axis=0)
+        overdraft[done:stop] = (balances < 0).mean(axis=0)
+        done = stop
+
+    return SimulationResult(result.dates[last_of_date], bands, mean, overdraft,
+                            scenarios)
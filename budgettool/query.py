@@ -0,0 +1,163 @@
+"""Indexed queries on a computed forecast.
+
+Balances are looked up by binary search on the sorted dates, and range
+minimum/maximum queries use a segment tree, so each query is O(log n).
+"""
+import numpy as np
+
+from .forecast import ForecastResult
+
+
+class _MinTree:
+    """Segment tree over an array answering range minimum queries."""
+    def __init__(self, values):
+        self.size = 1
+        while self.size < len(values):
+            self.size *= 2
+        self.tree = np.full(2 * self.size, np.inf)
+        self.tree[self.size:self.size + len(values)] = values
+        level = self.size
+        while level > 1:
+            self.tree[level // 2:level] = \
+                self.tree[level:2 * level].reshape(-1, 2).min(axis=1)
+            level //= 2
+
+    def _nodes(self, lo, hi):
+        """Nodes covering values[lo:hi], in order from left to right."""
+        left = []
+        right = []
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                left.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right.append(hi)
+            lo //= 2
+            hi //= 2
+        return left + right[::-1]
+
+    def min(self, lo, hi):
+        """Minimum of values[lo:hi]. inf if the range is empty."""
+        return min((self.tree[node] for node in self._nodes(lo, hi)),
+                   default=np.inf)
+
+    def first_below(self, lo, hi, threshold):
+        """Smallest index i in [lo, hi) with values[i] < threshold, or None."""
+        for node in self._nodes(lo, hi):
+            if self.tree[node] < threshold:
+                while node < self.size:
+                    node *= 2
+                    if self.tree[node] >= threshold:
+                        node += 1
+                return node - self.size
+        return None
+
+
+def _to_datetime64(date):
+    return np.datetime64(date, 'D')
+
+
+class ForecastQuery:
+    """Answer balance questions about a forecast without rescanning it.
+
+    Dates passed to the query methods are datetime.date objects, and windows
+    include both their start and end dates.
+    """
+    def __init__(self, forecast, starting_balance=None):
+        """Index a forecast.
+
+        Parameters
+        -----
+        forecast - list of ForecastEntry or a ForecastResult
+        starting_balance - (optional) balance before the first entry. By
+            default it is worked out from the first entry.
+        """
+        if isinstance(forecast, ForecastResult):
+            forecast = forecast.in_dollars()
+            self.dates = forecast.dates
+            self.balances = np.asarray(forecast.balances, dtype=np.float64)
+            first_amount = forecast.amounts[0] if len(forecast) else None
+        else:
+            forecast = list(forecast)
+            self.dates = np.array([entry.date for entry in forecast],
+                                  dtype='datetime64[D]')
+            self.balances = np.array([entry.balance for entry in forecast],
+                                     dtype=np.float64)
+            first_amount = (forecast[0].transaction.amount
+                            if forecast else None)
+
+        if starting_balance is None and first_amount is not None:
+            starting_balance = self.balances[0].item() - first_amount
+        self.starting_balance = starting_balance
+
+        self._min_tree = _MinTree(self.balances)
+        self._max_tree = _MinTree(-self.balances)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _index_range(self, start, end):
+        """Indexes [lo, hi) of the entries within the window."""
+        lo = 0
+        hi = len(self.dates)
+        if start is not None:
+            lo = np.searchsorted(self.dates, _to_datetime64(start), side='left')
+        if end is not None:
+            hi = np.searchsorted(self.dates, _to_datetime64(end), side='right')
+        return int(lo), int(max(lo, hi))
+
+    def _balance_before(self, index):
+        if index == 0:
+            return self.starting_balance
+        return self.balances[index - 1].item()
+
+    def balance_on(self, date):
+        """Balance at the end of date, after all of that day's entries."""
+        return self._balance_before(self._index_range(None, date)[1])
+
+    def min_balance(self, start=None, end=None):
+        """Lowest balance between start and end.
+
+        Includes the balance carried into the window from before start.
+        """
+        lo, hi = self._index_range(start, end)
+        lowest = self._min_tree.min(lo, hi)
+        opening = self._balance_before(lo)
+        if opening is not None:
+            lowest = min(lowest, opening)
+        return None if lowest == np.inf else float(lowest)
+
+    def max_balance(self, start=None, end=None):
+        """Highest balance between start and end.
+
+        Includes the balance carried into the window from before start.
+        """
+        lo, hi = self._index_range(start, end)
+        highest = -self._max_tree.min(lo, hi)
+        opening = self._balance_before(lo)
+        if opening is not None:
+            highest = max(highest, opening)
+        return None if highest == -np.inf else float(highest)
+
+    def first_below(self, threshold, start=None, end=None):
+        """Date of the first entry between start and end which leaves the
+        balance below threshold, or None if the balance stays at or above it.
+        """
+        lo, hi = self._index_range(start, end)
+        index = self._min_tree.first_below(lo, hi, threshold)
+        if index is None:
+            return None
+        return self.dates[index].item()
+
+    def first_above(self, threshold, start=None, end=None):
+        """Date of the first entry between start and end which leaves the
+        balance above threshold, or None if the balance stays at or below it.
+        """
+        lo, hi = self._index_range(start, end)
+        index = self._max_tree.first_below(lo, hi, -threshold)
+        if index is None:
+            return None
+        return self.dates[index].item()
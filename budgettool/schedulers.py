@@ -3,8 +3,11 @@ Dates are returned as instances of datetime.date
 """
 
 from calendar import monthrange
+import collections.abc
 import datetime
+import functools
 import math
+import numpy as np
 from .fileutils import str_to_date, date_to_str, str_to_weekday, weekday_to_str, get_default
 
 
@@ -34,6 +37,38 @@ def _check_calc_date_range(schedule_start,
     return start, end
 
 
+def _view_to_array(view, subrange=None):
+    """Convert the result of a scheduler's view() into a datetime64[D] array.
+
+    subrange - (optional) (first, last) dates. Only the dates between them,
+        inclusive, are converted.
+    """
+    if subrange is not None:
+        first, last = subrange
+        view = view[view.index_on_or_after(first):
+                    view.index_on_or_after(last + datetime.timedelta(1))]
+    return view.to_array()
+
+
+def _month_number(date):
+    """Months since year 0 of the month containing date."""
+    return date.year * 12 + date.month - 1
+
+
+def _slice_range(index, length):
+    """range of the indexes selected by a slice of a sequence of length."""
+    return range(length)[index]
+
+
+def _normalize_index(index, length):
+    """Convert a possibly negative index into a position, checking bounds."""
+    if index < 0:
+        index += length
+    if not 0 <= index < length:
+        raise IndexError("view index out of range")
+    return index
+
+
 class _DayIncrIter:
     """Fixed increment in days
     """
@@ -50,10 +85,22 @@ class _DayIncrIter:
         out = self.next_date
         self.next_date += self.container.increment
         return out
+    def advance_to(self, date):
+        """Skip ahead so the next date returned is the first on or after date.
+
+        Never moves backwards.
+        """
+        if date > self.next_date:
+            increment = self.container.increment.days
+            steps = -(-(date - self.next_date).days // increment)
+            self.next_date += steps * self.container.increment
 
 
-class _DayIncrContainer:
+class _DayIncrContainer(collections.abc.Sequence):
     """Fixed increment in days
+
+    Behaves as a lazy sequence of dates. Length, indexing and membership are
+    computed without iterating.
     """
     def __init__(self, start_date, end_date, increment):
         """Increment up to, and including end_date
@@ -63,6 +110,41 @@ class _DayIncrContainer:
         self.increment = increment
     def __iter__(self):
         return _DayIncrIter(self)
+    def to_array(self):
+        """All dates in the container as a datetime64[D] array."""
+        if self.start_date > self.end_date:
+            return np.array([], dtype='datetime64[D]')
+        return np.arange(np.datetime64(self.start_date, 'D'),
+                         np.datetime64(self.end_date, 'D') + 1,
+                         self.increment.days)
+    def __len__(self):
+        if self.start_date > self.end_date:
+            return 0
+        return (self.end_date - self.start_date).days // self.increment.days + 1
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indexes = _slice_range(index, len(self))
+            if indexes.step < 0:
+                return [self[i] for i in indexes]
+            first = self.start_date + indexes.start * self.increment
+            increment = indexes.step * self.increment
+            return _DayIncrContainer(first,
+                                     first + (len(indexes) - 1) * increment,
+                                     increment)
+        return self.start_date + _normalize_index(index, len(self)) * self.increment
+    def __contains__(self, date):
+        return (self.start_date <= date <= self.end_date
+                and (date - self.start_date).days % self.increment.days == 0)
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+    def index_on_or_after(self, date):
+        """Index of the first date on or after date, len(self) if there is none.
+        """
+        if date <= self.start_date:
+            return 0
+        steps = -(-(date - self.start_date).days // self.increment.days)
+        return min(steps, len(self))
 
 
 class _MonthIncrIter:
@@ -86,10 +168,26 @@ class _MonthIncrIter:
         self.next_month = datetime.date(next_year, (next_month - 1) % 12 + 1, 1)
 
         return out
+    def advance_to(self, date):
+        """Skip ahead so the next date returned is the first on or after date.
+
+        Never moves backwards.
+        """
+        container = self.container
+        first = _month_number(container.start_month)
+        current = (_month_number(self.next_month) - first) // container.increment
+        target = container.index_on_or_after(date)
+        if target > current:
+            year, month = divmod(first + target * container.increment, 12)
+            self.next_month = datetime.date(year, month + 1, 1)
 
 
-class _MonthIncrContainer:
-    """Increment in months."""
+class _MonthIncrContainer(collections.abc.Sequence):
+    """Increment in months.
+
+    Behaves as a lazy sequence of dates. Length, indexing and membership are
+    computed without iterating.
+    """
 
     def __init__(self, start_month, day, end_date, increment):
         """Start at next_date, increment up to and including end_date.
@@ -105,15 +203,178 @@ class _MonthIncrContainer:
     def __iter__(self):
         return _MonthIncrIter(self)
 
+    def to_array(self):
+        """All dates in the container as a datetime64[D] array.
+
+        Days past the end of a short month are clamped to the last day of that
+        month, the same as the iterator.
+        """
+        months = np.arange(np.datetime64(self.start_month, 'M'),
+                           np.datetime64(self.end_date, 'M') + 1,
+                           self.increment)
+        month_starts = months.astype('datetime64[D]')
+        days_in_month = ((months + 1).astype('datetime64[D]')
+                         - month_starts).astype(np.int64)
+        dates = month_starts + (np.minimum(self.day, days_in_month) - 1)
+        return dates[dates <= np.datetime64(self.end_date, 'D')]
+
+    def _date_in_month(self, month_number):
+        """The generated date in a month, given as months since year 0."""
+        year, month = divmod(month_number, 12)
+        month += 1
+        return datetime.date(year, month,
+                             min(self.day, monthrange(year, month)[1]))
+
+    def __len__(self):
+        first = _month_number(self.start_month)
+        span = _month_number(self.end_date) - first
+        if span < 0:
+            return 0
+        num = span // self.increment + 1
+        if self._date_in_month(first + (num - 1) * self.increment) > self.end_date:
+            num -= 1
+        return num
+
+    def __contains__(self, date):
+        offset = _month_number(date) - _month_number(self.start_month)
+        return (date <= self.end_date
+                and offset >= 0
+                and offset % self.increment == 0
+                and date == self._date_in_month(_month_number(date)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indexes = _slice_range(index, len(self))
+            if indexes.step < 0:
+                return [self[i] for i in indexes]
+            if not indexes:
+                return _MonthIncrContainer(
+                    self.start_month, self.day,
+                    self.start_month.replace(day=1) - datetime.timedelta(1),
+                    self.increment)
+            first = self[indexes.start]
+            return _MonthIncrContainer(first.replace(day=1),
+                                       self.day,
+                                       self[indexes[-1]],
+                                       indexes.step * self.increment)
+        index = _normalize_index(index, len(self))
+        return self._date_in_month(_month_number(self.start_month)
+                                   + index * self.increment)
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def index_on_or_after(self, date):
+        """Index of the first date on or after date, len(self) if there is none.
+        """
+        offset = _month_number(date) - _month_number(self.start_month)
+        index = max(0, -(-offset // self.increment))
+        length = len(self)
+        if index < length and self[index] < date:
+            index += 1
+        return min(index, length)
+
+
+def _empty_view(date):
+    """A view without any dates, which still supports index_on_or_after()."""
+    return _DayIncrContainer(date, date - datetime.timedelta(1),
+                             datetime.timedelta(1))
+
+
+# number of expanded date windows kept by view_array()
+VIEW_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _cached_view_array(schedule, start, end):
+    dates = _view_to_array(schedule.view(start, end))
+    # shared between callers, so it must not be changed
+    dates.flags.writeable = False
+    return dates
+
+
+def clear_view_cache():
+    """Forget all the date windows memoized by view_array()."""
+    _cached_view_array.cache_clear()
+
+
+def view_cache_info():
+    """Hits, misses and size of the view_array() memo, see functools.lru_cache."""
+    return _cached_view_array.cache_info()
+
+
+class _Schedule:
+    """Base of the schedules.
+
+    Schedules are immutable values. Two schedules of the same type with the
+    same fields are equal and hash the same, so the date windows they expand
+    to can be memoized and shared by every template using an equal schedule.
+
+    Subclasses list their fields in __slots__, in the order of the constructor
+    arguments, and set them in __init__ with _set().
+    """
+    __slots__ = ()
+
+    def _set(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} schedules can't be changed".format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{} schedules can't be changed".format(type(self).__name__))
+
+    def _key(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash((type(self), self._key()))
+
+    def __reduce__(self):
+        return (type(self), self._key())
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__,
+                               ", ".join(repr(value) for value in self._key()))
+
+    def view_array(self, start, end=None, duration=None, subrange=None):
+        """Same as view(), but the dates are returned as a datetime64[D] array.
+
+        Whole windows are memoized by (schedule, start, end), so the returned
+        array is read only.
+
+        subrange - (optional) (first, last) dates. Only the part of the view
+            between them is returned, without generating the rest. These are
+            not memoized.
+        """
+        if subrange is not None:
+            return _view_to_array(self.view(start, end, duration), subrange)
+        if end is None and duration is not None:
+            end = start + duration - datetime.timedelta(1)
+        return _cached_view_array(self, start, end)
+
+    def count(self, start, end=None, duration=None):
+        """Number of events within a window, computed without generating them.
+        """
+        return len(self.view(start, end, duration))
+
 
-class Once:
+class Once(_Schedule):
     """ One time transaction. Generates a single event on the specified date.
     """
+    __slots__ = ('date',)
 
     schedule_type = 'once'
 
     def __init__(self, date):
-        self.date = date
+        self._set(date=date)
 
     def view(self, start, end=None, duration=None):
         """Generate the subset of events within a date window.
@@ -132,9 +393,9 @@ class Once:
                                             end,
                                             duration)
         if start <= self.date and self.date <= end:
-            return [self.date]
+            return _DayIncrContainer(self.date, self.date, datetime.timedelta(1))
         else:
-            return []
+            return _empty_view(self.date)
 
     @staticmethod
     def from_dict(schedule):
@@ -149,10 +410,11 @@ class Once:
         ))
 
 
-class EveryNWeek:
+class EveryNWeek(_Schedule):
     """ Repeating schedule on weekly increments.
     For example, repeat every 2 weeks starting on Jan 1.
     """
+    __slots__ = ('start', 'step', 'end')
 
     schedule_type = 'everynweek'
 
@@ -165,9 +427,7 @@ class EveryNWeek:
         step - the number of weeks between events
         end - cuttoff for last event to generate
         """
-        self.start = start
-        self.step = step
-        self.end = end
+        self._set(start=start, step=step, end=end)
 
     def view(self, start, end=None, duration=None):
         """The subset of events which fall within a window.
@@ -184,7 +444,7 @@ class EveryNWeek:
             self.start, start,
             self.end, end, duration)
         if iter_start >= iter_end:
-            return []
+            return _empty_view(iter_start)
 
         step = self.step * datetime.timedelta(days=7)
 
@@ -218,9 +478,10 @@ class EveryNWeek:
         return iter(tuple(key_pairs))
 
 
-class EveryNMonth:
+class EveryNMonth(_Schedule):
     """Event repeats on the same day every month.
     """
+    __slots__ = ('start', 'step', 'end')
 
     schedule_type = 'everynmonth'
 
@@ -234,9 +495,7 @@ class EveryNMonth:
         step - how many months between repeats
         end - cuttoff for last date to generate (non-inclusive)
         """
-        self.start = start
-        self.step  = step
-        self.end   = end
+        self._set(start=start, step=step, end=end)
 
     def view(self, start, end=None, duration=None):
         """The subset of events which fall within a window.
@@ -253,7 +512,7 @@ class EveryNMonth:
             self.start, start,
             self.end, end, duration)
         if iter_start >= iter_end:
-            return []
+            return _empty_view(iter_start)
 
         day = self.start.day
         start = self.start
@@ -295,10 +554,11 @@ class EveryNMonth:
         return iter(tuple(key_pairs))
 
 
-class Weekly:
+class Weekly(_Schedule):
     """ Repeat every week on a specifc day of the week.
     For example, repeat every Tuesday.
     """
+    __slots__ = ('day_of_week', 'start', 'end')
 
     schedule_type = 'weekly'
 
@@ -313,9 +573,7 @@ class Weekly:
         end - cuttoff for last event to generate
         iter_start: cuttoff for earliest event to generate.
         """
-        self.day_of_week = day_of_week
-        self.start = start
-        self.end = end
+        self._set(day_of_week=day_of_week, start=start, end=end)
 
     def view(self, start, end=None, duration=None):
         """The subset of events which fall within a window.
@@ -332,7 +590,7 @@ class Weekly:
             self.start, start,
             self.end, end, duration)
         if iter_start > iter_end:
-            return []
+            return _empty_view(iter_start)
 
         offset = (self.day_of_week - iter_start.weekday()) % 7
         iter_start = iter_start + datetime.timedelta(offset)
@@ -360,8 +618,9 @@ class Weekly:
         return iter(tuple(key_pairs))
 
 
-class Monthly:
+class Monthly(_Schedule):
     """Repeat every month on the specified day"""
+    __slots__ = ('day_of_month', 'start', 'end')
 
     schedule_type = 'monthly'
 
@@ -374,9 +633,7 @@ class Monthly:
         end - end date. No events generated past this date.
         iter_start - first day to consider generating an event.
         """
-        self.day_of_month = day_of_month
-        self.start = start
-        self.end = end
+        self._set(day_of_month=day_of_month, start=start, end=end)
 
     def view(self, start, end=None, duration=None):
         """The subset of events which fall within a window.
@@ -393,7 +650,7 @@ class Monthly:
             self.start, start,
             self.end, end, duration)
         if iter_start >= iter_end:
-            return []
+            return _empty_view(iter_start)
 
         start = iter_start
         if iter_start.day > self.day_of_month:
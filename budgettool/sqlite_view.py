@@ -0,0 +1,152 @@
+"""Save forecasts into a SQLite database so they can be queried with SQL.
+
+Many budgets can be stored in one database. Each one is keyed by its name,
+normally the budget filename, and saving a budget again replaces its rows.
+
+Tables
+-----
+budgets - id, name
+categories - id, name
+templates - id, budget_id, position, name, category_id, amount
+entries - budget_id, date, template_id, category_id, amount, balance
+
+Dates are stored as YYYY-MM-DD text, so they sort and compare as dates.
+"""
+import sqlite3
+
+import numpy as np
+
+from .forecast import ForecastResult
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS budgets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS templates (
+    id INTEGER PRIMARY KEY,
+    budget_id INTEGER NOT NULL REFERENCES budgets(id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    amount REAL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    budget_id INTEGER NOT NULL REFERENCES budgets(id),
+    date TEXT NOT NULL,
+    template_id INTEGER NOT NULL REFERENCES templates(id),
+    category_id INTEGER NOT NULL REFERENCES categories(id),
+    amount REAL NOT NULL,
+    balance REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_budget_date ON entries (budget_id, date);
+CREATE INDEX IF NOT EXISTS entries_date ON entries (date);
+CREATE INDEX IF NOT EXISTS entries_category_date ON entries (category_id, date);
+CREATE INDEX IF NOT EXISTS templates_budget ON templates (budget_id);
+"""
+
+
+def connect(filename):
+    """Open a forecast database, creating the tables if they don't exist."""
+    connection = sqlite3.connect(filename)
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _row_id(connection, table, name):
+    """Id of the row with name in budgets or categories, adding it if needed."""
+    connection.execute(
+        "INSERT OR IGNORE INTO {} (name) VALUES (?)".format(table), (name,))
+    return connection.execute(
+        "SELECT id FROM {} WHERE name = ?".format(table), (name,)).fetchone()[0]
+
+
+def _insert_templates(connection, budget_id, templates):
+    """Add (name, category, amount) templates of a budget.
+
+    Returns a list with the (template id, category id) of each template.
+    """
+    category_ids = {}
+    ids = []
+    for position, (name, category, amount) in enumerate(templates):
+        if category not in category_ids:
+            category_ids[category] = _row_id(connection, 'categories', category)
+        cursor = connection.execute(
+            "INSERT INTO templates (budget_id, position, name, category_id, amount) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (budget_id, position, name, category_ids[category], amount))
+        ids.append((cursor.lastrowid, category_ids[category]))
+    return ids
+
+
+def _result_rows(result, budget_id, template_ids):
+    """Entry rows for a ForecastResult, built from its columns."""
+    ids = np.array([template_id for template_id, _ in template_ids] or [0],
+                   dtype=np.int64)
+    categories = np.array([category_id for _, category_id in template_ids] or [0],
+                          dtype=np.int64)
+    return zip([budget_id] * len(result),
+               np.datetime_as_string(result.dates, unit='D').tolist(),
+               ids[result.template_index].tolist(),
+               categories[result.template_index].tolist(),
+               result.amounts.tolist(),
+               result.balances.tolist())
+
+
+def save_forecast_to_sqlite(forecast, database, budget_name):
+    """Save forecasted transactions and balances into a SQLite database.
+
+    Parameters
+    ========
+    forecast - any iterable of ForecastEntry, or a ForecastResult. Forecasts
+        in cents are saved in dollars.
+    database - filename of the database, or a connection from connect()
+    budget_name - key of the budget in the database, such as its filename.
+        Rows already saved under this name are replaced.
+
+    For a ForecastResult, there is one row in templates for each
+    TemplateTransaction. Otherwise there is one for each (name, category)
+    pair and its amount is NULL.
+    """
+    connection = connect(database) if isinstance(database, str) else database
+    try:
+        # one transaction for the whole budget
+        with connection:
+            budget_id = _row_id(connection, 'budgets', budget_name)
+            connection.execute("DELETE FROM entries WHERE budget_id = ?", (budget_id,))
+            connection.execute("DELETE FROM templates WHERE budget_id = ?", (budget_id,))
+
+            if isinstance(forecast, ForecastResult):
+                forecast = forecast.in_dollars()
+                template_ids = _insert_templates(
+                    connection, budget_id,
+                    [(snapshot.transaction.name, snapshot.transaction.category,
+                      snapshot.transaction.amount)
+                     for snapshot in forecast.snapshots])
+                rows = _result_rows(forecast, budget_id, template_ids)
+            else:
+                entries = list(forecast)
+                positions = {}
+                for entry in entries:
+                    positions.setdefault(
+                        (entry.transaction.name, entry.transaction.category),
+                        len(positions))
+                template_ids = _insert_templates(
+                    connection, budget_id,
+                    [(name, category, None) for name, category in positions])
+                rows = ((budget_id, entry.date.isoformat())
+                        + template_ids[positions[(entry.transaction.name,
+                                                  entry.transaction.category)]]
+                        + (entry.transaction.amount, entry.balance)
+                        for entry in entries)
+
+            connection.executemany(
+                "INSERT INTO entries (budget_id, date, template_id, category_id, "
+                "amount, balance) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    finally:
+        if connection is not database:
+            connection.close()
@@ -0,0 +1,102 @@
+"""Opt-in instrumentation of loading and forecasting a budget.
+
+Pass a ForecastStats as the stats argument of budget_from_json(), forecast()
+or Budget.forecast() to find out which stages and templates the time goes
+to. Without one nothing is recorded.
+"""
+import collections
+import contextlib
+import time
+
+import numpy as np
+
+
+class ForecastStats:
+    """Timings and counts recorded while loading and forecasting.
+
+    Attributes
+    -----
+    stages - dictionary of stage name to wall time in seconds, in the order
+        the stages first ran. Stages which run again are added up.
+    template_seconds - Counter of template name to the time spent expanding
+        its occurrences
+    template_events - Counter of template name to the number of entries it
+        generated
+    schedule_events - Counter of schedule type to the number of entries
+        generated by templates with that type of schedule
+    peak_entries - most entries held in one forecast
+    """
+    def __init__(self):
+        self.stages = collections.OrderedDict()
+        self.template_seconds = collections.Counter()
+        self.template_events = collections.Counter()
+        self.schedule_events = collections.Counter()
+        self.peak_entries = 0
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Context manager adding the time spent inside it to a stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = (self.stages.get(name, 0.0)
+                                 + time.perf_counter() - started)
+
+    def add_template_time(self, template, seconds):
+        self.template_seconds[template.transaction.name] += seconds
+
+    def add_events(self, template, count):
+        """Record count entries generated by template."""
+        self.template_events[template.transaction.name] += count
+        self.schedule_events[template.schedule.schedule_type] += count
+
+    def held_entries(self, count):
+        """Record that a forecast with count entries was held in memory."""
+        self.peak_entries = max(self.peak_entries, count)
+
+    def add_result(self, result):
+        """Record the entries of each template in a ForecastResult."""
+        counts = np.bincount(result.template_index, minlength=len(result.snapshots))
+        for snapshot, count in zip(result.snapshots, counts.tolist()):
+            self.add_events(snapshot, count)
+        self.held_entries(len(result))
+
+    def as_dict(self):
+        """The recorded values as a dictionary which can be saved as json."""
+        return {
+            'stages': dict(self.stages),
+            'total_seconds': sum(self.stages.values()),
+            'peak_entries': self.peak_entries,
+            'schedule_events': dict(self.schedule_events),
+            'template_events': dict(self.template_events),
+            'template_seconds': dict(self.template_seconds),
+        }
+
+    def format_report(self, top=10):
+        """Readable summary, listing the top templates by time and entries."""
+        lines = ["stages"]
+        for name, seconds in self.stages.items():
+            lines.append("  {:20s} {:9.4f}s".format(name, seconds))
+        lines.append("  {:20s} {:9.4f}s".format('total', sum(self.stages.values())))
+        lines.append("peak entries held: {}".format(self.peak_entries))
+
+        lines.append("entries by schedule type")
+        for name, count in self.schedule_events.most_common():
+            lines.append("  {:20s} {:10d}".format(name, count))
+        if self.template_seconds:
+            lines.append("slowest templates")
+            for name, seconds in self.template_seconds.most_common(top):
+                lines.append("  {:20s} {:9.4f}s {:10d} entries".format(
+                    name, seconds, self.template_events[name]))
+        lines.append("templates with the most entries")
+        for name, count in self.template_events.most_common(top):
+            lines.append("  {:20s} {:10d}".format(name, count))
+        return "\n".join(lines)
+
+
+def timed(stats, name):
+    """stats.stage(name), or a context manager doing nothing if stats is None."""
+    if stats is None:
+        return contextlib.nullcontext()
+    return stats.stage(name)
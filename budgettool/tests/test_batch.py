@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Unit test for batch forecasting
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import batch
+from ..budget_loader import budget_from_json
+from ..csv_view import save_forecast_to_csv
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'example.json')
+
+
+class TestBatch(unittest.TestCase):
+    """Test cases for forecasting many files."""
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.in_dir = os.path.join(self.tmpdir.name, 'in')
+        self.out_dir = os.path.join(self.tmpdir.name, 'out')
+        os.makedirs(self.in_dir)
+        for index in range(3):
+            shutil.copy(EXAMPLE,
+                        os.path.join(self.in_dir, 'budget{}.json'.format(index)))
+        with open(os.path.join(self.in_dir, 'broken.json'), 'w') as outfile:
+            outfile.write('{"filetype": "budgettool"')
+
+        self.expected = os.path.join(self.tmpdir.name, 'expected.csv')
+        save_forecast_to_csv(budget_from_json(EXAMPLE).forecast(), self.expected)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _check(self, results):
+        self.assertEqual([os.path.basename(result.filename) for result in results],
+                         ['broken.json', 'budget0.json', 'budget1.json',
+                          'budget2.json'])
+        self.assertIsNotNone(results[0].error)
+        with open(self.expected) as infile:
+            expected = infile.read()
+        for result in results[1:]:
+            self.assertIsNone(result.error)
+            self.assertGreater(result.entries, 0)
+            with open(result.output) as infile:
+                self.assertEqual(infile.read(), expected)
+
+        report = batch.format_report(results, 1.0)
+        self.assertIn('FAILED', report)
+        self.assertIn('4 files, 1 failed', report)
+
+    def test_serial(self):
+        filenames = batch.find_budgets(self.in_dir)
+        self._check(batch.forecast_files(filenames, self.out_dir, workers=1))
+
+    def test_process_pool(self):
+        filenames = batch.find_budgets(os.path.join(self.in_dir, '*.json'))
+        results = batch.forecast_files(filenames, self.out_dir, workers=2,
+                                       chunksize=2)
+        self._check(results)
+        self.assertEqual(os.path.dirname(results[1].output), self.out_dir)
+
+    def test_same_names(self):
+        """Budgets with the same name in different directories are kept apart."""
+        for name in ('a', 'b'):
+            os.makedirs(os.path.join(self.in_dir, name))
+            shutil.copy(EXAMPLE, os.path.join(self.in_dir, name, 'budget.json'))
+        filenames = batch.find_budgets(os.path.join(self.in_dir, '*', 'budget.json'))
+        results = batch.forecast_files(filenames, self.out_dir, workers=1)
+        self.assertEqual([result.output for result in results],
+                         [os.path.join(self.out_dir, 'a', 'budget.csv'),
+                          os.path.join(self.out_dir, 'b', 'budget.csv')])
+        for result in results:
+            self.assertIsNone(result.error)
+
+        with self.assertRaises(ValueError):
+            batch.forecast_files(filenames * 2, self.out_dir, workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
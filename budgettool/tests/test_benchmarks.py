@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Unit test for the synthetic budgets and benchmark suite
+"""
+
+import collections
+import json
+import unittest
+
+from ..budget import Budget
+from .. import budget, fileutils, schedulers
+from ..benchmarks import bench_dates, bench_shards, bench_suite
+from ..benchmarks.synthetic import synthetic_budget
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Test cases for the benchmark helpers."""
+    def test_synthetic_budget(self):
+        data = synthetic_budget(num_templates=50, exception_density=0.2, years=3,
+                                seed=4)
+        self.assertEqual(data, synthetic_budget(num_templates=50,
+                                                exception_density=0.2, years=3,
+                                                seed=4))
+        budget = Budget.from_dict(json.loads(json.dumps(data)))
+        self.assertEqual(len(budget.budget), 50)
+        self.assertEqual(budget.duration.days, round(365.25 * 3))
+
+        forecast = budget.forecast()
+        exceptions = sum(1 for entry in forecast
+                         if any(entry.date in item.exceptions
+                                and item.transaction.name == entry.transaction.name
+                                for item in budget.budget))
+        self.assertGreater(exceptions, 0.1 * len(forecast))
+        self.assertLess(exceptions, 0.3 * len(forecast))
+
+        types = collections.Counter(
+            item['schedule']['type'] for item in
+            synthetic_budget(num_templates=20, mix={'weekly': 1, 'once': 0})['budget'])
+        self.assertEqual(types, {'weekly': 20})
+
+    def test_suite(self):
+        results = bench_suite.run(num_templates=10, years=1, repeat=1)
+        self.assertGreater(results['entries'], 0)
+        for name in ('jsonparser.load', 'Budget.from_dict', 'forecast',
+                     'save_forecast_to_csv', 'render_forecast'):
+            self.assertGreaterEqual(results['timings'][name], 0)
+        self.assertIn('render_forecast', bench_suite.format_results(results, results))
+        json.dumps(results)
+
+    def test_shards(self):
+        results = bench_shards.run(workers=2, num_templates=10, horizons=(1,),
+                                   repeat=1)
+        self.assertEqual(len(results), 1)
+        self.assertGreater(results[0]['entries'], 0)
+        self.assertFalse(results[0]['sharded_by_default'])
+        json.dumps(results)
+
+    def test_dates_baseline(self):
+        parser = fileutils.str_to_date
+        with bench_dates._use_parser(bench_dates._strptime_date):
+            for module in (fileutils, schedulers, budget):
+                self.assertIs(module.str_to_date, bench_dates._strptime_date)
+        for module in (fileutils, schedulers, budget):
+            self.assertIs(module.str_to_date, parser)
+        results = bench_dates.run(num_exceptions=100, repeat=1)
+        self.assertGreater(results['speedup'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Unit test for binary forecast files
+"""
+
+import datetime as dt
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from ..transaction import TemplateTransaction
+from .. import schedulers
+from ..forecast import forecast, ForecastResult
+from ..binary_view import save_forecast_to_npy, load_forecast_npy
+
+
+class TestBinaryView(unittest.TestCase):
+    """Test cases for saving and memory-mapping binary forecasts."""
+    def setUp(self):
+        self.templates = [
+            TemplateTransaction("paycheck", "income", 1234.56,
+                                schedulers.EveryNWeek(dt.date(2016, 3, 23), 2),
+                                exceptions={dt.date(2016, 4, 20): 1000.0}),
+            TemplateTransaction("electric", "bill", -123.32,
+                                schedulers.Monthly(12)),
+            TemplateTransaction("water", "bill", -40,
+                                schedulers.Monthly(12)),
+        ]
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, 'forecast.npy')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        args = (4567.89, self.templates, dt.date(2016, 3, 1))
+        expected = forecast(*args, end=dt.date(2018, 6, 1))
+        for source in (expected, forecast(*args, end=dt.date(2018, 6, 1),
+                                          columnar=True)):
+            save_forecast_to_npy(source, self.filename)
+            loaded = load_forecast_npy(self.filename)
+            self.assertIsInstance(loaded.records, np.memmap)
+            self.assertEqual(len(loaded), len(expected))
+            self.assertEqual(list(loaded), expected)
+            self.assertEqual(sorted(loaded.categories), ['bill', 'income'])
+            self.assertEqual(loaded.balances[-1], expected[-1].balance)
+            self.assertEqual(list(loaded[5:9]), expected[5:9])
+
+            window = loaded.between(dt.date(2017, 1, 1), dt.date(2017, 3, 12))
+            self.assertEqual(list(window),
+                             [entry for entry in expected
+                              if dt.date(2017, 1, 1) <= entry.date <= dt.date(2017, 3, 12)])
+            del loaded, window
+
+        # forecasts in cents are saved in dollars
+        templates = [TemplateTransaction.from_dict(dict(template), cents=True)
+                     for template in self.templates]
+        args = (456789, templates, dt.date(2016, 3, 1), dt.date(2018, 6, 1))
+        save_forecast_to_npy(ForecastResult.from_templates(*args), self.filename)
+        self.assertEqual(list(load_forecast_npy(self.filename, mmap=False)),
+                         forecast(*args))
+
+        save_forecast_to_npy([], self.filename)
+        self.assertEqual(len(load_forecast_npy(self.filename, mmap=False)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
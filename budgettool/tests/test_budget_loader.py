@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Unit test for loading budgets
+"""
+
+import datetime as dt
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from .. import budget_loader
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'example.json')
+
+
+class TestBudgetLoader(unittest.TestCase):
+    """Test cases for budget_from_json and its cache."""
+    def setUp(self):
+        budget_loader.clear_cache()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, 'budget.json')
+        shutil.copy(EXAMPLE, self.filename)
+        self.cache_dir = os.path.join(self.tmpdir.name, 'cache')
+
+    def tearDown(self):
+        budget_loader.clear_cache()
+        self.tmpdir.cleanup()
+
+    def _load_counting(self, **kwargs):
+        """Load the budget and return it with the number of json parses."""
+        with mock.patch.object(budget_loader.jsonparser, 'load',
+                               wraps=budget_loader.jsonparser.load) as load:
+            loaded = budget_loader.budget_from_json(self.filename, **kwargs)
+        return loaded, load.call_count
+
+    def test_memory_cache(self):
+        first, parses = self._load_counting()
+        self.assertEqual(parses, 1)
+        second, parses = self._load_counting()
+        self.assertEqual(parses, 0)
+        self.assertIsNot(first, second)
+        self.assertEqual(dict(first), dict(second))
+        self.assertEqual(first.forecast(), second.forecast())
+
+        # a changed file is parsed again
+        with open(self.filename) as infile:
+            text = infile.read()
+        with open(self.filename, 'w') as outfile:
+            outfile.write(text.replace('4567.89', '1000.00'))
+        third, parses = self._load_counting()
+        self.assertEqual(parses, 1)
+        self.assertEqual(third.start_balance, 1000.0)
+
+    def test_pickled_on_reuse(self):
+        """Budgets loaded once aren't pickled, ones loaded again are."""
+        from_dict = budget_loader.budget.Budget.from_dict
+        for expected_parses, expected_pickles in ((1, 0), (1, 1), (0, 0)):
+            with mock.patch.object(budget_loader.pickle, 'dumps',
+                                   wraps=budget_loader.pickle.dumps) as dumps, \
+                 mock.patch.object(budget_loader.budget.Budget, 'from_dict',
+                                   wraps=from_dict) as parse:
+                loaded = budget_loader.budget_from_json(self.filename)
+            self.assertEqual(parse.call_count, expected_parses)
+            self.assertEqual(dumps.call_count, expected_pickles)
+            self.assertEqual(loaded.start_date, dt.date(2016, 7, 28))
+
+    def test_disk_cache(self):
+        first, parses = self._load_counting(cache_dir=self.cache_dir)
+        self.assertEqual(parses, 1)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        budget_loader.clear_cache()
+        second, parses = self._load_counting(cache_dir=self.cache_dir)
+        self.assertEqual(parses, 0)
+        self.assertEqual(second.start_date, dt.date(2016, 7, 28))
+        self.assertEqual(first.forecast(), second.forecast())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Unit test for csv output
+"""
+
+import datetime as dt
+import gzip
+import os
+import tempfile
+import unittest
+
+from ..transaction import TemplateTransaction
+from .. import schedulers
+from ..forecast import forecast, iter_forecast, ForecastResult
+from ..csv_view import save_forecast_to_csv
+
+
+class TestCsvView(unittest.TestCase):
+    """Test cases for save_forecast_to_csv."""
+    def setUp(self):
+        self.templates = [
+            TemplateTransaction("paycheck", "income", 1234.56,
+                                schedulers.EveryNWeek(dt.date(2016, 3, 23), 2),
+                                exceptions={dt.date(2016, 4, 20): 1000.0}),
+            TemplateTransaction("electric", "bill", -123.32,
+                                schedulers.Monthly(12)),
+        ]
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _save(self, entries, name):
+        filename = os.path.join(self.tmpdir.name, name)
+        save_forecast_to_csv(entries, filename)
+        with open(filename) as infile:
+            return infile.read()
+
+    def test_columnar_matches_list(self):
+        """Both forecast types must produce the same file."""
+        args = (4567.89, self.templates, dt.date(2016, 3, 1))
+        expected = self._save(forecast(*args, end=dt.date(2016, 6, 1)),
+                              'list.csv')
+        actual = self._save(
+            forecast(*args, end=dt.date(2016, 6, 1), columnar=True),
+            'columns.csv')
+        self.assertEqual(actual, expected)
+
+        lines = expected.splitlines()
+        self.assertEqual(lines[0], 'date YYYY-MM-dd,name,amount,balance')
+        self.assertEqual(lines[1], '2016-03-12,electric,$-123.32,$4444.57')
+        self.assertIn('2016-04-20,paycheck,$1000.00,', expected)
+
+    def test_cents(self):
+        """Forecasts in cents are written in dollars."""
+        templates = [TemplateTransaction.from_dict(dict(template), cents=True)
+                     for template in self.templates]
+        args = (456789, templates, dt.date(2016, 3, 1), dt.date(2016, 6, 1))
+        self.assertEqual(self._save(ForecastResult.from_templates(*args), 'cents.csv'),
+                         self._save(forecast(*args), 'dollars.csv'))
+
+    def test_streaming(self):
+        """Generators, small batches and gzip give the same rows."""
+        args = (4567.89, self.templates, dt.date(2016, 3, 1))
+        expected = self._save(forecast(*args, end=dt.date(2018, 6, 1)),
+                              'list.csv')
+
+        filename = os.path.join(self.tmpdir.name, 'stream.csv')
+        save_forecast_to_csv(iter_forecast(*args, end=dt.date(2018, 6, 1)),
+                             filename, batch_size=7)
+        with open(filename) as infile:
+            self.assertEqual(infile.read(), expected)
+
+        filename = os.path.join(self.tmpdir.name, 'columns.csv.gz')
+        save_forecast_to_csv(forecast(*args, end=dt.date(2018, 6, 1), columnar=True),
+                             filename, batch_size=10)
+        with gzip.open(filename, 'rt') as infile:
+            self.assertEqual(infile.read(), expected)
+
+        filename = os.path.join(self.tmpdir.name, 'compressed')
+        save_forecast_to_csv(forecast(*args, end=dt.date(2018, 6, 1)),
+                             filename, compress=True)
+        with gzip.open(filename, 'rt') as infile:
+            self.assertEqual(infile.read(), expected)
+
+        self.assertEqual(self._save([], 'empty.csv'),
+                         'date YYYY-MM-dd,name,amount,balance\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Unit test for file helpers
+"""
+
+import datetime
+import unittest
+
+from .. import fileutils
+
+
+class TestDates(unittest.TestCase):
+    """Test cases for date parsing and formatting."""
+    def test_str_to_date(self):
+        expected = datetime.date(2016, 7, 8)
+        for text in ('8 July 2016', '08 July 2016', '8 july 2016',
+                     ' 8  JULY 2016', '2016-07-08'):
+            self.assertEqual(fileutils.str_to_date(text), expected)
+
+        for text in ('8 Jul 2016', '32 July 2016', '2016-13-01', 'July',
+                     '8 July', ''):
+            with self.assertRaises(ValueError):
+                fileutils.str_to_date(text)
+
+    def test_date_to_str(self):
+        day = datetime.date(2016, 1, 1)
+        while day < datetime.date(2017, 1, 1):
+            text = fileutils.date_to_str(day)
+            self.assertEqual(text, datetime.datetime.strftime(day, '%d %B %Y'))
+            self.assertEqual(fileutils.str_to_date(text), day)
+            day += datetime.timedelta(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,16 @@
 """
 
 import datetime as dt
+import importlib
 import unittest
+from unittest import mock
 
 from ..transaction import TemplateTransaction
 from .. import schedulers
-from ..forecast import forecast, ForecastEntry
+from ..forecast import forecast, iter_forecast, rollup, ForecastEntry, ForecastResult
+
+# the package's forecast attribute is the function
+forecast_module = importlib.import_module(ForecastResult.__module__)
 
 
 class TestForecast(unittest.TestCase):
@@ -119,6 +124,215 @@ class TestForecast(unittest.TestCase):
             ]
         )
 
+    def test_iter_forecast(self):
+        """The streaming forecast must match the materialized one."""
+        a_date = dt.date(2000, 1, 1)
+        templates = [
+            TemplateTransaction("monthly", "category", 1,
+                                schedulers.Monthly(15)),
+            TemplateTransaction("everynmonth", "category", 10,
+                                schedulers.EveryNMonth(a_date, 2),
+                                exceptions={dt.date(2000, 3, 1): 20}),
+            TemplateTransaction("weekly", "category", -3,
+                                schedulers.Weekly(5)),
+            TemplateTransaction("same_day", "category", 7,
+                                schedulers.EveryNWeek(dt.date(2000, 1, 15))),
+            TemplateTransaction("once", "category", 1000,
+                                schedulers.Once(dt.date(2000, 4, 15))),
+        ]
+
+        expected = forecast(50, templates, a_date, end=dt.date(2001, 1, 1))
+        output = iter_forecast(50, templates, a_date, end=dt.date(2001, 1, 1))
+        self.assertNotIsInstance(output, list)
+        self.assertEqual(list(output), expected)
+
+        # entries are available without generating the whole horizon
+        output = iter_forecast(50, templates, a_date, end=dt.date(9000, 1, 1))
+        self.assertEqual(next(output), expected[0])
+
+    def test_columnar(self):
+        """The columnar forecast must hold the same entries as the list."""
+        a_date = dt.date(2000, 1, 1)
+        templates = [
+            TemplateTransaction("monthly", "category", 1.25,
+                                schedulers.Monthly(15)),
+            TemplateTransaction("everynmonth", "category", 10,
+                                schedulers.EveryNMonth(a_date, 2),
+                                exceptions={dt.date(2000, 3, 1): 20.5}),
+            TemplateTransaction("weekly", "category", -3.1,
+                                schedulers.Weekly(5)),
+            TemplateTransaction("same_day", "category", 7,
+                                schedulers.EveryNWeek(dt.date(2000, 1, 15))),
+        ]
+        end = dt.date(2003, 1, 1)
+
+        expected = forecast(50.3, templates, a_date, end=end)
+        output = forecast(50.3, templates, a_date, end=end, columnar=True)
+        self.assertIsInstance(output, ForecastResult)
+        self.assertEqual(len(output), len(expected))
+        self.assertEqual(output, expected)
+        self.assertEqual(list(output), expected)
+        self.assertEqual(output[3], expected[3])
+        self.assertEqual(output[-1], expected[-1])
+        self.assertEqual(list(output[10:20]), expected[10:20])
+        self.assertEqual(output.balances[-1], expected[-1].balance)
+
+        empty = forecast(50.3, [], a_date, end=end, columnar=True)
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(list(empty), [])
+
+    def test_rollup(self):
+        """Rollups must match grouping the full forecast."""
+        a_date = dt.date(2000, 1, 1)
+        templates = [
+            TemplateTransaction("monthly", "bill", -1.25,
+                                schedulers.Monthly(15)),
+            TemplateTransaction("everynmonth", "income", 10,
+                                schedulers.EveryNMonth(a_date, 2),
+                                exceptions={dt.date(2000, 3, 1): -20.5,
+                                            dt.date(2000, 3, 2): 99}),
+            TemplateTransaction("weekly", "bill", -3,
+                                schedulers.Weekly(5)),
+            TemplateTransaction("everynweek", "income", 7,
+                                schedulers.EveryNWeek(dt.date(2000, 1, 15), 3)),
+            TemplateTransaction("once", "bill", 1000,
+                                schedulers.Once(dt.date(2000, 4, 15))),
+        ]
+        end = dt.date(2003, 5, 1)
+        # the second window starts on a day with transactions
+        for start in (dt.date(2000, 2, 10), dt.date(2000, 3, 1)):
+            entries = forecast(0, templates, start, end=end)
+
+            for period, months in (('day', 0), ('month', 1), ('quarter', 3),
+                                   ('year', 12)):
+                expected = {}
+                for entry in entries:
+                    if months:
+                        month = (entry.date.month - 1) // months * months + 1
+                        period_start = dt.date(entry.date.year, month, 1)
+                    else:
+                        period_start = entry.date
+                    key = (period_start, entry.transaction.category)
+                    income, expense = expected.get(key, (0, 0))
+                    if entry.transaction.amount > 0:
+                        income += entry.transaction.amount
+                    else:
+                        expense += entry.transaction.amount
+                    expected[key] = (income, expense)
+
+                output = rollup(templates, start, end=end, period=period)
+                self.assertEqual(sorted(output), sorted(expected))
+                for key, totals in output.items():
+                    self.assertAlmostEqual(totals.income, expected[key][0])
+                    self.assertAlmostEqual(totals.expense, expected[key][1])
+
+        output = rollup(templates, start, duration=end - start + dt.timedelta(1))
+        self.assertEqual(output, rollup(templates, start, end=end))
+
+    def test_iterables(self):
+        """Any iterable of templates can be forecast, not only lists."""
+        templates = [
+            TemplateTransaction("monthly", "bill", -1.25, schedulers.Monthly(15)),
+            TemplateTransaction("weekly", "income", 3, schedulers.Weekly(5)),
+        ]
+        args = (dt.date(2000, 1, 1), dt.date(2001, 1, 1))
+        expected = forecast(0, templates, *args)
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(forecast(0, iter(templates), *args), expected)
+        self.assertEqual(forecast(0, iter(templates), *args, columnar=True), expected)
+        self.assertEqual(list(iter_forecast(0, iter(templates), *args)), expected)
+        self.assertEqual(rollup(iter(templates), *args), rollup(templates, *args))
+
+    def test_sharded(self):
+        """Splitting the window across processes gives the same forecast."""
+        # starts on the 31st, where Monthly skips ahead, so shard boundaries
+        # must not restart the schedules
+        a_date = dt.date(2000, 1, 31)
+        templates = [
+            TemplateTransaction("monthly", "bill", -1.25,
+                                schedulers.Monthly(15)),
+            TemplateTransaction("everynmonth", "income", 10,
+                                schedulers.EveryNMonth(dt.date(1999, 12, 31), 2),
+                                exceptions={dt.date(2000, 3, 31): -20.5}),
+            TemplateTransaction("weekly", "bill", -3,
+                                schedulers.Weekly(5, end=dt.date(2003, 2, 2))),
+            TemplateTransaction("everynweek", "income", 7,
+                                schedulers.EveryNWeek(dt.date(2000, 1, 15), 3)),
+            TemplateTransaction("once", "bill", 1000,
+                                schedulers.Once(dt.date(2002, 4, 15))),
+        ]
+        end = dt.date(2004, 1, 1)
+        expected = forecast(0, templates, a_date, end=end)
+
+        # short windows and single cpu machines are forecast in this process
+        self.assertEqual(forecast_module._shards(templates, a_date, end, 4), [])
+        with mock.patch('os.cpu_count', return_value=1), \
+             mock.patch.object(forecast_module, 'MIN_SHARD_ENTRIES', 1):
+            self.assertEqual(forecast_module._shards(templates, a_date, end, 4), [])
+
+        with mock.patch('os.cpu_count', return_value=4), \
+             mock.patch.object(forecast_module, 'MIN_SHARD_ENTRIES', 1):
+            # shards are only sent the templates which occur in them
+            shards = forecast_module._shards(templates, a_date, end, 3)
+            self.assertEqual([positions.tolist() for positions, _ in shards],
+                             [[0, 1, 2, 3], [0, 1, 2, 3, 4], [0, 1, 2, 3]])
+
+            for workers in (2, 3, 7):
+                output = forecast(0, templates, a_date, end=end, columnar=True,
+                                  workers=workers)
+                self.assertEqual(output.dates.tolist(),
+                                 [entry.date for entry in expected])
+                self.assertEqual(output.balances.tolist(),
+                                 [entry.balance for entry in expected])
+            self.assertEqual(forecast(0, templates, a_date, end=end, workers=2),
+                             expected)
+            self.assertEqual(forecast(0, templates, a_date, end=a_date, workers=4),
+                             forecast(0, templates, a_date, end=a_date))
+
+    def test_cents(self):
+        """Templates in cents add up exactly and come out in dollars."""
+        data = [
+            {'name': 'coffee', 'category': 'food', 'amount': -0.1,
+             'schedule': {'type': 'weekly', 'data': {'day': 'mon'}},
+             'except': [{'date': '3 January 2012', 'amount': -0.35}]},
+            {'name': 'refund', 'category': 'income', 'amount': 0.7,
+             'schedule': {'type': 'monthly', 'data': {'day': 3}}},
+        ]
+        dollars = [TemplateTransaction.from_dict(item) for item in data]
+        cents = [TemplateTransaction.from_dict(item, cents=True) for item in data]
+        self.assertEqual(cents[0].transaction.amount, -10)
+        self.assertEqual(cents[0].exceptions, {dt.date(2012, 1, 3): -35})
+        self.assertEqual([dict(template) for template in cents],
+                         [dict(template) for template in dollars])
+
+        start = dt.date(2012, 1, 1)
+        end = dt.date(2061, 12, 31)
+        float_output = forecast(0.2, dollars, start, end=end)
+        output = forecast(20, cents, start, end=end, columnar=True)
+        self.assertFalse(output.cents)
+        self.assertEqual(output.dates.tolist(),
+                         [entry.date for entry in float_output])
+
+        # exact running total in cents, rounded once to the closest float
+        total = 20
+        exact = []
+        for entry in float_output:
+            total += round(entry.transaction.amount * 100)
+            exact.append(total / 100)
+        self.assertEqual(output.balances.tolist(), exact)
+        self.assertNotEqual([entry.balance for entry in float_output], exact)
+
+        self.assertEqual(forecast(20, cents, start, end=end), list(output))
+        self.assertEqual(list(iter_forecast(20, cents, start, end=end)), list(output))
+        self.assertEqual(output[0].transaction.amount, -0.35)
+
+        totals = rollup(cents, start, end=end, period='year')
+        self.assertEqual(totals[(dt.date(2012, 1, 1), 'income')].income, 8.4)
+        self.assertEqual(totals[(dt.date(2012, 1, 1), 'food')].expense, -5.45)
+
+        with self.assertRaises(ValueError):
+            forecast(0, dollars[:1] + cents[1:], start, end=end)
+
 
 if __name__ == '__main__':
     unittest.main()
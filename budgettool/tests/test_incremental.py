@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Unit test for incremental forecasts
+"""
+
+import datetime as dt
+import unittest
+
+from ..transaction import TemplateTransaction
+from .. import schedulers
+from ..budget import Budget
+from ..forecast import forecast
+from ..incremental import IncrementalForecast
+
+
+def _templates():
+    a_date = dt.date(2000, 1, 1)
+    return [
+        TemplateTransaction("monthly", "category", 1.25,
+                            schedulers.Monthly(15)),
+        TemplateTransaction("everynmonth", "category", 10,
+                            schedulers.EveryNMonth(a_date, 2),
+                            exceptions={dt.date(2000, 3, 1): 20.5}),
+        TemplateTransaction("weekly", "category", -3.1,
+                            schedulers.Weekly(5)),
+        TemplateTransaction("same_day", "category", 7,
+                            schedulers.EveryNWeek(dt.date(2000, 1, 15))),
+    ]
+
+
+class TestIncrementalForecast(unittest.TestCase):
+    """Edits must give the same forecast as computing it from scratch."""
+    start = dt.date(2000, 1, 1)
+    end = dt.date(2002, 1, 1)
+
+    def assertForecast(self, output, balance, templates):
+        expected = forecast(balance, templates, self.start, end=self.end)
+        self.assertEqual(list(output.result), expected)
+        self.assertEqual(output.templates, templates)
+
+    def test_insert_remove(self):
+        """Inserting and removing templates, and changing the balance."""
+        templates = _templates()
+        extra = TemplateTransaction("extra", "category", 100,
+                                    schedulers.Monthly(1, dt.date(2000, 6, 1)))
+        output = IncrementalForecast(50, templates, self.start, end=self.end)
+        first = output.result
+
+        output.insert(1, extra)
+        self.assertForecast(output, 50, templates[:1] + [extra] + templates[1:])
+        output.append(extra)
+        self.assertForecast(output, 50,
+                            templates[:1] + [extra] + templates[1:] + [extra])
+        output.remove(5)
+        output.remove(1)
+        self.assertForecast(output, 50, templates)
+        output.remove(0)
+        self.assertForecast(output, 50, templates[1:])
+
+        output.set_starting_balance(-20)
+        self.assertForecast(output, -20, templates[1:])
+
+        # earlier results are left alone
+        self.assertEqual(list(first),
+                         forecast(50, templates, self.start, end=self.end))
+
+    def test_update(self):
+        """update() applies the difference, unless templates were reordered."""
+        templates = _templates()
+        extra = TemplateTransaction("extra", "category", 100,
+                                    schedulers.Weekly(5))
+        output = IncrementalForecast(50, templates, self.start, end=self.end)
+
+        new_templates = [extra, templates[0], templates[2], templates[3]]
+        self.assertTrue(output.update(new_templates))
+        self.assertForecast(output, 50, new_templates)
+
+        self.assertFalse(output.update(list(reversed(new_templates))))
+        self.assertForecast(output, 50, new_templates)
+
+    def test_budget_edits(self):
+        """Budget keeps its forecast up to date through edits."""
+        templates = _templates()
+        budget = Budget(start_balance=50, start_date=self.start,
+                        duration=dt.timedelta(731), budget=list(templates))
+        self.assertEqual(budget.forecast(), forecast(
+            50, templates, self.start, duration=dt.timedelta(731)))
+
+        extra = TemplateTransaction("extra", "category", 100,
+                                    schedulers.Once(dt.date(2001, 5, 5)))
+        budget.add_item(extra)
+        self.assertEqual(budget.forecast(), forecast(
+            50, templates + [extra], self.start, duration=dt.timedelta(731)))
+
+        budget.modify(budget=templates[1:], start_balance=0)
+        self.assertEqual(budget.forecast(columnar=True), forecast(
+            0, templates[1:], self.start, duration=dt.timedelta(731)))
+
+        budget.modify(duration=dt.timedelta(100))
+        self.assertEqual(budget.forecast(), forecast(
+            0, templates[1:], self.start, duration=dt.timedelta(100)))
+
+        # direct changes to the list are noticed
+        budget.budget.append(extra)
+        self.assertEqual(budget.forecast(), forecast(
+            0, templates[1:] + [extra], self.start, duration=dt.timedelta(100)))
+
+        # and so are attributes assigned directly
+        budget.start_balance = 7
+        self.assertEqual(budget.forecast(), forecast(
+            7, templates[1:] + [extra], self.start, duration=dt.timedelta(100)))
+        budget.duration = dt.timedelta(731)
+        self.assertEqual(budget.forecast(), forecast(
+            7, templates[1:] + [extra], self.start, duration=dt.timedelta(731)))
+        budget.start_date = dt.date(2000, 6, 1)
+        self.assertEqual(budget.forecast(), forecast(
+            7, templates[1:] + [extra], dt.date(2000, 6, 1),
+            duration=dt.timedelta(731)))
+
+    def test_edit_in_place(self):
+        """Templates edited in place are forecast again, and results handed
+        out earlier keep the values they were computed from.
+        """
+        templates = _templates()
+        budget = Budget(start_balance=50, start_date=self.start,
+                        duration=dt.timedelta(731), budget=templates)
+        first = budget.forecast()
+        first_columns = budget.forecast(columnar=True)
+        output = IncrementalForecast(50, templates, self.start, end=self.end)
+
+        templates[0].transaction = templates[0].transaction._replace(amount=1e6)
+        templates[1].exceptions[dt.date(2000, 3, 1)] = -99.0
+        templates[2].schedule = schedulers.Weekly(2)
+        self.assertFalse(output.matches(templates))
+        self.assertTrue(output.update(templates))
+        self.assertTrue(output.matches(templates))
+        self.assertForecast(output, 50, templates)
+
+        self.assertEqual(budget.forecast(), forecast(
+            50, templates, self.start, duration=dt.timedelta(731)))
+
+        # every amount agrees with the balances
+        balances = [50] + [entry.balance for entry in budget.forecast()]
+        for entry, before in zip(budget.forecast(), balances):
+            self.assertAlmostEqual(entry.balance - before, entry.transaction.amount)
+        self.assertEqual(list(first_columns), first)
+        self.assertNotIn(1e6, [entry.transaction.amount for entry in first_columns])
+
+    def test_budget_cents(self):
+        """Budgets in cents are exact and reject templates in dollars."""
+        data = dict(Budget(start_balance=50.1, start_date=self.start,
+                           duration=dt.timedelta(731), budget=_templates()))
+        data['start_balance'] = data.pop('start_blance')
+        budget = Budget.from_dict(data, cents=True)
+        self.assertEqual(budget.start_balance, 5010)
+        templates = list(budget.budget)
+        expected = forecast(5010, templates, self.start, duration=dt.timedelta(731))
+        self.assertEqual(budget.forecast(), expected)
+        self.assertEqual(list(budget.iter_forecast()), expected)
+        self.assertEqual(budget.forecast(columnar=True).balances.dtype.kind, 'f')
+
+        extra = TemplateTransaction("extra", "category", 10001,
+                                    schedulers.Once(dt.date(2001, 5, 5)), cents=True)
+        budget.add_item(extra)
+        budget.modify(start_balance=0)
+        self.assertEqual(budget.forecast(), forecast(
+            0, templates + [extra], self.start, duration=dt.timedelta(731)))
+        # the same budget in dollars drifts away from the exact balance
+        self.assertEqual(budget.forecast()[-1].balance, 656.01)
+        self.assertNotEqual(Budget(start_balance=0, start_date=self.start,
+                                   duration=dt.timedelta(731),
+                                   budget=[template.in_dollars()
+                                           for template in budget.budget]
+                                   ).forecast()[-1].balance, 656.01)
+
+        with self.assertRaises(ValueError):
+            budget.add_item(TemplateTransaction("dollars", "category", 1.5,
+                                                schedulers.Monthly(3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
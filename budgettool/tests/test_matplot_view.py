@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Unit test for plotting forecasts
+"""
+
+import datetime as dt
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from .. import batch
+from .. import schedulers
+from ..forecast import forecast
+from ..matplot_view import decimate, render_forecast
+from ..transaction import TemplateTransaction
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'example.json')
+
+
+class TestMatplotView(unittest.TestCase):
+    """Test cases for decimating and rendering forecasts."""
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_decimate(self):
+        rng = np.random.default_rng(1)
+        dates = (np.datetime64('2020-01-01')
+                 + np.sort(rng.integers(0, 3650, 100000)).astype('timedelta64[D]'))
+        balances = np.cumsum(rng.normal(0, 100, len(dates)))
+
+        keep = decimate(dates, balances, 500)
+        self.assertLessEqual(len(keep), 4 * 500)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], len(dates) - 1)
+        self.assertEqual(balances[keep].min(), balances.min())
+        self.assertEqual(balances[keep].max(), balances.max())
+
+        # the extremes of every bucket are kept
+        days = (dates - dates[0]).astype(np.int64)
+        bucket = days * 500 // (days[-1] + 1)
+        for index in (0, 137, 499):
+            in_bucket = bucket == index
+            kept = balances[keep][in_bucket[keep]]
+            self.assertEqual(kept.min(), balances[in_bucket].min())
+            self.assertEqual(kept.max(), balances[in_bucket].max())
+
+        np.testing.assert_array_equal(decimate(dates[:100], balances[:100], 500),
+                                      np.arange(100))
+
+    def test_render(self):
+        templates = [
+            TemplateTransaction("paycheck", "income", 1234.56,
+                                schedulers.EveryNWeek(dt.date(2016, 3, 23), 2)),
+            TemplateTransaction("coffee", "food", -4.5, schedulers.Weekly(3)),
+        ]
+        for columnar in (False, True):
+            filename = os.path.join(self.tmpdir.name, 'chart{}.png'.format(columnar))
+            render_forecast(forecast(100.0, templates, dt.date(2016, 3, 1),
+                                     end=dt.date(2056, 3, 1), columnar=columnar),
+                            filename, width=300, height=200)
+            with open(filename, 'rb') as infile:
+                self.assertEqual(infile.read(8), b'\x89PNG\r\n\x1a\n')
+
+    def test_batch_charts(self):
+        shutil.copy(EXAMPLE, self.tmpdir.name)
+        filenames = batch.find_budgets(self.tmpdir.name)
+        results = batch.forecast_files(filenames, workers=1, charts=True)
+        self.assertIsNone(results[0].error)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.tmpdir.name, 'example.png')))
+
+
+if __name__ == '__main__':
+    unittest.main()
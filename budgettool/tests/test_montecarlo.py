@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Unit test for Monte Carlo simulation
+"""
+
+import datetime as dt
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from ..transaction import TemplateTransaction
+from .. import schedulers
+from .. import distributions
+from .. import montecarlo
+from ..forecast import forecast
+
+
+class TestSimulate(unittest.TestCase):
+    """Test cases for montecarlo.simulate."""
+    start = dt.date(2016, 1, 1)
+    end = dt.date(2017, 1, 1)
+
+    def _templates(self, distribution):
+        return [
+            TemplateTransaction("pay", "income", 1000,
+                                schedulers.EveryNWeek(dt.date(2016, 1, 8), 2),
+                                exceptions={dt.date(2016, 2, 5): 2000}),
+            TemplateTransaction("food", "bill", -300,
+                                schedulers.Weekly(4),
+                                distribution=distribution),
+            TemplateTransaction("rent", "bill", -1800,
+                                schedulers.Monthly(1)),
+        ]
+
+    def _expected_end_of_day(self, templates):
+        balances = {}
+        for entry in forecast(500, templates, self.start, end=self.end):
+            balances[entry.date] = entry.balance
+        return balances
+
+    def test_exact(self):
+        """With no spread every scenario is the plain forecast."""
+        templates = self._templates(distributions.Normal(0))
+        expected = self._expected_end_of_day(templates)
+        with mock.patch.object(montecarlo, '_MAX_BLOCK_VALUES', 70):
+            output = montecarlo.simulate(500, templates, self.start, end=self.end,
+                                         scenarios=7, seed=1)
+        self.assertEqual(output.dates.tolist(), sorted(expected))
+        expected_balances = [expected[date] for date in sorted(expected)]
+        for percentile in (5, 50, 95):
+            np.testing.assert_allclose(output.percentiles[percentile],
+                                       expected_balances)
+        np.testing.assert_allclose(output.mean, expected_balances)
+        np.testing.assert_array_equal(output.overdraft_probability,
+                                      np.array(expected_balances) < 0)
+
+    def test_spread(self):
+        templates = self._templates(distributions.Range(-400, -200))
+        expected = self._expected_end_of_day(self._templates(None))
+        output = montecarlo.simulate(500, templates, self.start, end=self.end,
+                                     scenarios=2000, percentiles=(1, 50, 99),
+                                     seed=3)
+        expected_balances = np.array([expected[date] for date in sorted(expected)])
+        # the range is centred on the scheduled amount
+        np.testing.assert_allclose(output.mean, expected_balances, atol=40)
+        self.assertTrue(np.all(output.percentiles[1] <= output.percentiles[50]))
+        self.assertTrue(np.all(output.percentiles[50] <= output.percentiles[99]))
+        self.assertTrue(np.all(output.overdraft_probability >= 0))
+        self.assertTrue(np.all(output.overdraft_probability <= 1))
+        self.assertGreater(output.overdraft_probability.max(), 0)
+
+    def test_storage_format(self):
+        template = self._templates(distributions.Normal(25.0))[1]
+        loaded = TemplateTransaction.from_dict(dict(template))
+        self.assertIsInstance(loaded.distribution, distributions.Normal)
+        self.assertEqual(loaded.distribution.stddev, 25.0)
+        self.assertEqual(dict(loaded), dict(template))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Unit test for the lazily imported package names
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+class TestPackage(unittest.TestCase):
+    """Test cases for importing budgettool."""
+    def _run(self, code):
+        env = dict(os.environ, PYTHONPATH=os.path.abspath(ROOT))
+        return subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                              stdout=subprocess.PIPE,
+                              universal_newlines=True).stdout.split()
+
+    def test_no_matplotlib(self):
+        self.assertEqual(self._run(
+            "import sys, budgettool as bt\n"
+            "from budgettool import batch\n"
+            "bt.plot_forecast, bt.save_forecast_to_csv\n"
+            "print('matplotlib' in sys.modules)"), ['False'])
+
+    def test_forecast_is_function(self):
+        self.assertEqual(self._run(
+            "import budgettool as bt\n"
+            "import budgettool.budget, budgettool.forecast\n"
+            "from budgettool.forecast import ForecastResult\n"
+            "print(bt.forecast.__name__, type(bt.forecast).__name__)\n"
+            "print(sorted(bt.__all__) == sorted(set(dir(bt)) & set(bt.__all__)))"),
+                         ['forecast', 'function', 'True'])
+
+
+if __name__ == '__main__':
+    unittest.main()
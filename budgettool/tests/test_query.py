@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Unit test for forecast queries
+"""
+
+import datetime as dt
+import random
+import unittest
+
+from ..transaction import TemplateTransaction
+from .. import schedulers
+from ..forecast import forecast, ForecastResult
+from ..query import ForecastQuery
+
+
+class TestForecastQuery(unittest.TestCase):
+    """Queries must agree with a linear scan of the forecast."""
+    def setUp(self):
+        self.start = dt.date(2000, 1, 1)
+        self.templates = templates = [
+            TemplateTransaction("pay", "income", 1000,
+                                schedulers.EveryNWeek(dt.date(2000, 1, 7), 2)),
+            TemplateTransaction("rent", "bill", -1500,
+                                schedulers.Monthly(1)),
+            TemplateTransaction("food", "bill", -120.5,
+                                schedulers.Weekly(5)),
+            TemplateTransaction("car", "bill", -4000,
+                                schedulers.Once(dt.date(2000, 9, 3))),
+        ]
+        self.entries = forecast(500, templates, self.start,
+                                end=dt.date(2001, 12, 31))
+        self.columns = forecast(500, templates, self.start,
+                                end=dt.date(2001, 12, 31), columnar=True)
+
+    def _balance_on(self, date):
+        balance = 500
+        for entry in self.entries:
+            if entry.date > date:
+                break
+            balance = entry.balance
+        return balance
+
+    def test_queries(self):
+        rand = random.Random(4)
+        for source in (self.entries, self.columns):
+            query = ForecastQuery(source)
+            self.assertEqual(query.starting_balance, 500)
+            for _ in range(200):
+                first = self.start + dt.timedelta(rand.randint(-10, 740))
+                last = first + dt.timedelta(rand.randint(0, 200))
+                in_window = [entry for entry in self.entries
+                             if first <= entry.date <= last]
+                balances = ([self._balance_on(first - dt.timedelta(1))]
+                            + [entry.balance for entry in in_window])
+                threshold = rand.uniform(-3000, 2000)
+
+                self.assertEqual(query.balance_on(first), self._balance_on(first))
+                self.assertAlmostEqual(query.min_balance(first, last), min(balances))
+                self.assertAlmostEqual(query.max_balance(first, last), max(balances))
+                self.assertEqual(
+                    query.first_below(threshold, first, last),
+                    next((entry.date for entry in in_window
+                          if entry.balance < threshold), None))
+                self.assertEqual(
+                    query.first_above(threshold, first, last),
+                    next((entry.date for entry in in_window
+                          if entry.balance > threshold), None))
+
+    def test_cents(self):
+        """Forecasts in cents are queried in dollars."""
+        templates = [TemplateTransaction.from_dict(dict(template), cents=True)
+                     for template in self.templates]
+        query = ForecastQuery(ForecastResult.from_templates(
+            50000, templates, self.start, end=dt.date(2001, 12, 31)))
+        self.assertEqual(query.starting_balance, 500)
+        self.assertAlmostEqual(query.min_balance(),
+                               ForecastQuery(self.entries).min_balance())
+        self.assertAlmostEqual(query.balance_on(dt.date(2001, 6, 1)),
+                               self._balance_on(dt.date(2001, 6, 1)))
+
+    def test_empty(self):
+        query = ForecastQuery([], starting_balance=10)
+        self.assertEqual(query.balance_on(self.start), 10)
+        self.assertEqual(query.min_balance(), 10)
+        self.assertIsNone(query.first_below(100))
+        self.assertIsNone(ForecastQuery([]).min_balance())
+
+
+if __name__ == '__main__':
+    unittest.main()
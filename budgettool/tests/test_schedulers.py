@@ -5,6 +5,7 @@
 from collections import namedtuple
 from datetime import date, timedelta
 import math
+import pickle
 import unittest
 
 from .. import schedulers
@@ -273,6 +274,189 @@ class TestSchedulers(unittest.TestCase):
         self.assertEqual(len(out), 1)
         self.assertEqual(out[0].day, 20)
 
+    def test_view_array(self):
+        """view_array() must produce the same dates as iterating view()
+        """
+        scheds = [
+            schedulers.Once(date(2016, 2, 29)),
+            schedulers.EveryNWeek(date(2015, 3, 2)),
+            schedulers.EveryNWeek(date(2014, 7, 9), 3, date(2017, 1, 1)),
+            schedulers.EveryNMonth(date(2015, 1, 31)),
+            schedulers.EveryNMonth(date(2015, 8, 30), 5),
+            schedulers.Weekly(4),
+            schedulers.Weekly(0, date(2015, 6, 1), date(2016, 6, 1)),
+            schedulers.Monthly(31),
+            schedulers.Monthly(1, date(2015, 4, 20), date(2017, 2, 1)),
+        ]
+        windows = [
+            (date(2015, 1, 1), date(2018, 1, 1)),
+            (date(2016, 2, 29), date(2016, 3, 1)),
+            (date(2016, 1, 30), date(2016, 5, 31)),
+            (date(2019, 1, 1), date(2018, 1, 1)),
+        ]
+        for sched in scheds:
+            for start, end in windows:
+                expected = list(sched.view(start, end))
+                out = sched.view_array(start, end)
+                self.assertEqual(out.dtype, 'datetime64[D]')
+                self.assertEqual(out.tolist(), expected)
+
+            out = sched.view_array(date(2015, 2, 3), duration=timedelta(400))
+            expected = list(sched.view(date(2015, 2, 3), duration=timedelta(400)))
+            self.assertEqual(out.tolist(), expected)
+
+    def test_count(self):
+        """count() and membership must agree with iterating view()
+        """
+        scheds = [
+            schedulers.Once(date(2016, 2, 29)),
+            schedulers.EveryNWeek(date(2015, 3, 2)),
+            schedulers.EveryNWeek(date(2014, 7, 9), 3, date(2017, 1, 1)),
+            schedulers.EveryNMonth(date(2015, 1, 31)),
+            schedulers.EveryNMonth(date(2015, 8, 30), 5),
+            schedulers.Weekly(4),
+            schedulers.Weekly(0, date(2015, 6, 1), date(2016, 6, 1)),
+            schedulers.Monthly(31),
+            schedulers.Monthly(1, date(2015, 4, 20), date(2017, 2, 1)),
+        ]
+        first = date(2014, 12, 1)
+        for sched in scheds:
+            for offset in range(0, 900, 37):
+                for length in (0, 1, 27, 28, 29, 30, 31, 200, 1000):
+                    start = first + timedelta(offset)
+                    end = start + timedelta(length)
+                    view = sched.view(start, end)
+                    expected = list(view)
+                    self.assertEqual(sched.count(start, end), len(expected))
+                    for day in range(length + 1):
+                        self.assertEqual(start + timedelta(day) in view,
+                                         start + timedelta(day) in expected)
+
+    def test_view_sequence(self):
+        """Views support len(), indexing, slicing and reversed()
+        """
+        scheds = [
+            schedulers.Once(date(2016, 2, 29)),
+            schedulers.EveryNWeek(date(2014, 7, 9), 3, date(2017, 1, 1)),
+            schedulers.EveryNMonth(date(2015, 1, 31)),
+            schedulers.EveryNMonth(date(2015, 8, 30), 5),
+            schedulers.Weekly(4),
+            schedulers.Monthly(31),
+            schedulers.Monthly(1, date(2015, 4, 20), date(2017, 2, 1)),
+        ]
+        slices = [slice(None), slice(3, 9), slice(2, None, 4), slice(-5, None),
+                  slice(None, None, -2), slice(8, 3, -1), slice(40, 50),
+                  slice(5, 5)]
+        for sched in scheds:
+            view = sched.view(date(2015, 2, 10), date(2017, 6, 1))
+            expected = list(view)
+            self.assertEqual(len(view), len(expected))
+            self.assertEqual(list(reversed(view)), expected[::-1])
+            for index in range(-len(expected), len(expected)):
+                self.assertEqual(view[index], expected[index])
+            with self.assertRaises(IndexError):
+                view[len(expected)]
+            for part in slices:
+                self.assertEqual(list(view[part]), expected[part])
+                self.assertEqual(len(view[part]), len(expected[part]))
+
+            for offset in range(-40, 900, 3):
+                day = date(2015, 2, 10) + timedelta(offset)
+                self.assertEqual(
+                    view.index_on_or_after(day),
+                    len([x for x in expected if x < day]))
+
+    def test_empty_view(self):
+        """Views outside the schedule are empty sequences, not lists
+        """
+        scheds = [
+            schedulers.Once(date(2014, 2, 28)),
+            schedulers.EveryNWeek(date(2014, 7, 9), 3, date(2015, 1, 1)),
+            schedulers.EveryNMonth(date(2015, 1, 31), 1, date(2015, 1, 1)),
+            schedulers.Weekly(4, end=date(2015, 1, 1)),
+            schedulers.Monthly(31, end=date(2015, 1, 1)),
+        ]
+        for sched in scheds:
+            view = sched.view(date(2015, 2, 10), date(2017, 6, 1))
+            self.assertEqual(len(view), 0)
+            self.assertEqual(list(view), [])
+            self.assertEqual(view.index_on_or_after(date(2016, 1, 1)), 0)
+            self.assertEqual(len(view[1:]), 0)
+            self.assertNotIn(date(2016, 1, 1), view)
+            self.assertEqual(len(view.to_array()), 0)
+            self.assertEqual(len(sched.view_array(date(2015, 2, 10), date(2017, 6, 1),
+                                                  subrange=(date(2016, 1, 1),
+                                                            date(2016, 6, 1)))), 0)
+
+    def test_advance_to(self):
+        """advance_to() skips to the first date on or after the target
+        """
+        scheds = [
+            schedulers.Once(date(2016, 2, 29)),
+            schedulers.EveryNWeek(date(2014, 7, 9), 3, date(2017, 1, 1)),
+            schedulers.EveryNMonth(date(2015, 1, 31)),
+            schedulers.EveryNMonth(date(2015, 8, 30), 5),
+            schedulers.Weekly(4),
+            schedulers.Monthly(31),
+            schedulers.Monthly(1, date(2015, 4, 20), date(2017, 2, 1)),
+        ]
+        for sched in scheds:
+            view = sched.view(date(2015, 2, 10), date(2017, 6, 1))
+            expected = list(view)
+            for offset in range(-10, 900, 13):
+                target = date(2015, 2, 10) + timedelta(offset)
+                it = iter(view)
+                next(it, None)
+                it.advance_to(target)
+                later = [x for x in expected[1:] if x >= target]
+                self.assertEqual(list(it), later)
+
+            # never moves backwards
+            it = iter(view)
+            it.advance_to(date(2016, 6, 1))
+            it.advance_to(date(2015, 1, 1))
+            self.assertEqual(list(it), [x for x in expected if x >= date(2016, 6, 1)])
+
+    def test_value_semantics(self):
+        """Schedules are immutable values with memoized windows
+        """
+        scheds = [
+            schedulers.Once(date(2016, 2, 29)),
+            schedulers.EveryNWeek(date(2014, 7, 9), 3, date(2017, 1, 1)),
+            schedulers.EveryNMonth(date(2015, 8, 30), 5),
+            schedulers.Weekly(4),
+            schedulers.Monthly(1),
+        ]
+        copies = [schedulers.from_dict({'type': sched.schedule_type,
+                                        'data': dict(sched)})
+                  for sched in scheds]
+        for sched, copy in zip(scheds, copies):
+            self.assertIsNot(sched, copy)
+            self.assertEqual(sched, copy)
+            self.assertEqual(hash(sched), hash(copy))
+            self.assertEqual(pickle.loads(pickle.dumps(sched)), sched)
+            self.assertEqual(eval(repr(sched), {'datetime': __import__('datetime'),
+                                                **vars(schedulers)}), sched)
+            with self.assertRaises(AttributeError):
+                sched.end = date(2020, 1, 1)
+            with self.assertRaises(AttributeError):
+                sched.extra = 1
+        self.assertEqual(len(set(scheds + copies)), len(scheds))
+        self.assertNotEqual(schedulers.Weekly(1), schedulers.Monthly(1))
+        self.assertNotEqual(schedulers.Monthly(1), schedulers.Monthly(2))
+
+        # equal schedules share one expanded window
+        schedulers.clear_view_cache()
+        first = schedulers.Monthly(1).view_array(date(2015, 1, 1), date(2020, 1, 1))
+        again = schedulers.Monthly(1).view_array(date(2015, 1, 1),
+                                                 duration=timedelta(1827))
+        self.assertIs(again, first)
+        self.assertEqual(schedulers.view_cache_info().hits, 1)
+        with self.assertRaises(ValueError):
+            first[0] = first[1]
+        self.assertEqual(len(schedulers.Monthly(1).view_array(
+            date(2015, 1, 1), date(2020, 1, 1),
+            subrange=(date(2016, 1, 1), date(2016, 12, 31)))), 12)
 
 
 if __name__ == '__main__':
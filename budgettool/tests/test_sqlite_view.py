@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Unit test for saving forecasts into SQLite
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from .. import batch
+from ..budget_loader import budget_from_json
+from ..forecast import ForecastResult
+from ..sqlite_view import save_forecast_to_sqlite
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'example.json')
+
+
+class TestSqliteView(unittest.TestCase):
+    """Test cases for the SQLite forecast database."""
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.tmpdir.name, 'forecasts.db')
+        self.budget = budget_from_json(EXAMPLE)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _entries(self, name):
+        with sqlite3.connect(self.database) as connection:
+            return connection.execute(
+                "SELECT e.date, t.name, c.name, e.amount, e.balance "
+                "FROM entries e JOIN budgets b ON e.budget_id = b.id "
+                "JOIN templates t ON e.template_id = t.id "
+                "JOIN categories c ON e.category_id = c.id "
+                "WHERE b.name = ? ORDER BY e.rowid", (name,)).fetchall()
+
+    def test_round_trip(self):
+        expected = [(entry.date.isoformat(), entry.transaction.name,
+                     entry.transaction.category, entry.transaction.amount,
+                     entry.balance)
+                    for entry in self.budget.forecast()]
+        save_forecast_to_sqlite(self.budget.forecast(columnar=True),
+                                self.database, 'columns')
+        save_forecast_to_sqlite(self.budget.forecast(), self.database, 'entries')
+        self.assertEqual(self._entries('columns'), expected)
+        self.assertEqual(self._entries('entries'), expected)
+
+        # saving again replaces the rows of that budget only
+        save_forecast_to_sqlite(self.budget.forecast()[:3], self.database, 'entries')
+        self.assertEqual(self._entries('entries'), expected[:3])
+        self.assertEqual(self._entries('columns'), expected)
+
+        # forecasts in cents are saved in dollars
+        cents = budget_from_json(EXAMPLE, cents=True)
+        save_forecast_to_sqlite(ForecastResult.from_templates(
+            cents.start_balance, cents.budget, cents.start_date,
+            duration=cents.duration), self.database, 'cents')
+        save_forecast_to_sqlite(cents.forecast(), self.database, 'dollars')
+        self.assertEqual(self._entries('cents'), self._entries('dollars'))
+
+    def test_batch(self):
+        in_dir = os.path.join(self.tmpdir.name, 'in')
+        os.makedirs(in_dir)
+        for index in range(2):
+            shutil.copy(EXAMPLE, os.path.join(in_dir, 'budget{}.json'.format(index)))
+        with open(os.path.join(in_dir, 'broken.json'), 'w') as outfile:
+            outfile.write('{"filetype": "budgettool"')
+
+        for workers in (1, 2):
+            results = batch.forecast_to_sqlite(batch.find_budgets(in_dir),
+                                               self.database, workers=workers)
+            self.assertEqual([result.error is None for result in results],
+                             [False, True, True])
+            with sqlite3.connect(self.database) as connection:
+                counts = connection.execute(
+                    "SELECT b.name, count(*) FROM entries e "
+                    "JOIN budgets b ON e.budget_id = b.id GROUP BY b.name "
+                    "ORDER BY b.name").fetchall()
+            self.assertEqual(counts, [(os.path.abspath(result.filename),
+                                       result.entries)
+                                      for result in results[1:]])
+
+    def test_batch_cents(self):
+        """Batch export adds up the balances in cents when asked to."""
+        results = batch.forecast_to_sqlite([EXAMPLE], self.database, workers=1,
+                                           cents=True)
+        self.assertIsNone(results[0].error)
+        expected = budget_from_json(EXAMPLE, cents=True).forecast()
+        self.assertEqual([row[4] for row in self._entries(os.path.abspath(EXAMPLE))],
+                         [entry.balance for entry in expected])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Unit test for forecast instrumentation
+"""
+
+import datetime as dt
+import json
+import os
+import unittest
+
+from .. import schedulers
+from ..budget_loader import budget_from_json, clear_cache
+from ..forecast import forecast
+from ..stats import ForecastStats
+from ..transaction import TemplateTransaction
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', '..', 'example.json')
+
+
+class TestStats(unittest.TestCase):
+    """Test cases for recording stages and events."""
+    def setUp(self):
+        self.templates = [
+            TemplateTransaction("paycheck", "income", 1234.56,
+                                schedulers.EveryNWeek(dt.date(2016, 3, 23), 2)),
+            TemplateTransaction("electric", "bill", -123.32,
+                                schedulers.Monthly(12)),
+            TemplateTransaction("rent", "bill", -1000,
+                                schedulers.Monthly(1)),
+            TemplateTransaction("car", "bill", -5000,
+                                schedulers.Once(dt.date(2016, 5, 5))),
+        ]
+        self.args = (100.0, self.templates, dt.date(2016, 3, 1), dt.date(2017, 3, 1))
+
+    def test_forecast(self):
+        expected = {'paycheck': 25, 'electric': 12, 'rent': 13, 'car': 1}
+        for columnar in (False, True):
+            stats = ForecastStats()
+            result = forecast(*self.args, columnar=columnar, stats=stats)
+            self.assertEqual(list(stats.stages), ['expand', 'sort', 'balance'])
+            self.assertEqual(dict(stats.template_events), expected)
+            self.assertEqual(set(stats.template_seconds), set(expected))
+            self.assertEqual(stats.schedule_events,
+                             {'everynweek': 25, 'monthly': 25, 'once': 1})
+            self.assertEqual(stats.peak_entries, len(result))
+
+        report = stats.format_report(top=2)
+        self.assertIn('paycheck', report)
+        self.assertNotIn('car', report.split('templates with the most entries')[1])
+        json.dumps(stats.as_dict())
+
+    def test_budget(self):
+        clear_cache()
+        stats = ForecastStats()
+        budget = budget_from_json(EXAMPLE, stats=stats)
+        budget.forecast(stats=stats)
+        self.assertEqual(list(stats.stages),
+                         ['cache lookup', 'read', 'parse', 'cache store',
+                          'expand', 'sort', 'balance', 'entries'])
+        self.assertEqual(stats.peak_entries, len(budget.forecast()))
+
+
+if __name__ == '__main__':
+    unittest.main()
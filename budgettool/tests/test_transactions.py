@@ -38,6 +38,69 @@ class TestTransactions(unittest.TestCase):
         actual = list(view_2)
         self.assertEqual(actual, expected)
 
+    def test_many_exceptions(self):
+        start = datetime.date(2010, 1, 4)
+        exceptions = {}
+        for week in range(-50, 600, 3):
+            exceptions[start + datetime.timedelta(7 * week)] = float(week)
+            # dates that never match the schedule
+            exceptions[start + datetime.timedelta(7 * week + 1)] = -1.0
+        template = transaction.TemplateTransaction(
+            "test transaction", "TEST_CATEGORY", 100.00,
+            schedulers.EveryNWeek(start, 2), exceptions=exceptions)
+
+        view = template.view(datetime.date(2011, 1, 1), datetime.date(2018, 1, 1))
+        actual = list(view)
+        self.assertEqual(len(actual), len(list(view.schedule_view)))
+        for date, entry in actual:
+            self.assertEqual(entry.amount, exceptions.get(date, 100.0))
+            self.assertEqual(entry.name, "test transaction")
+
+        dates, amounts = template.view_array(datetime.date(2011, 1, 1),
+                                             datetime.date(2018, 1, 1))
+        self.assertEqual(dates.tolist(), [date for date, _ in actual])
+        self.assertEqual(amounts.tolist(), [entry.amount for _, entry in actual])
+
+        it = iter(view)
+        it.advance_to(datetime.date(2014, 3, 1))
+        self.assertEqual(list(it), [pair for pair in actual
+                                    if pair[0] >= datetime.date(2014, 3, 1)])
+
+        # editing an exception in place is noticed
+        date = start + datetime.timedelta(7 * 104)
+        template.exceptions[date] = 1.0
+        template.view_array(datetime.date(2011, 1, 1), datetime.date(2018, 1, 1))
+        template.exceptions[date] = 999.0
+        self.assertIn((date, template.transaction._replace(amount=999.0)),
+                      list(template.view(datetime.date(2011, 1, 1),
+                                         datetime.date(2018, 1, 1))))
+        dates, amounts = template.view_array(datetime.date(2011, 1, 1),
+                                             datetime.date(2018, 1, 1))
+        self.assertEqual(amounts[dates.tolist().index(date)], 999.0)
+
+        # replacing the exceptions is noticed
+        template.exceptions = {}
+        self.assertTrue(all(entry.amount == 100.0 for _, entry in template.view(
+            datetime.date(2011, 1, 1), datetime.date(2018, 1, 1))))
+
+    def test_total(self):
+        template = transaction.TemplateTransaction(
+            "test transaction",
+            "TEST_CATEGORY",
+            100.00,
+            schedulers.EveryNWeek(datetime.date(2016, 6, 1), 2),
+            exceptions={datetime.date(2016, 6, 29): 250.0,
+                        datetime.date(2016, 7, 27): 0.0,
+                        datetime.date(2016, 7, 28): 1000.0,
+                        datetime.date(2017, 7, 26): -50.0}
+        )
+        for start, end in ((datetime.date(2016, 1, 1), datetime.date(2017, 1, 1)),
+                           (datetime.date(2016, 7, 1), datetime.date(2016, 8, 1)),
+                           (datetime.date(2016, 7, 1), datetime.date(2018, 8, 1)),
+                           (datetime.date(2018, 7, 1), datetime.date(2018, 8, 1))):
+            expected = sum(entry.amount for _, entry in template.view(start, end))
+            self.assertAlmostEqual(template.total(start, end), expected)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,13 @@
 """Containers for metadata associated with a transaction
 or entry in the ledger.
 """
+import bisect
 import collections
 
+import numpy as np
+
 from . import schedulers
+from . import distributions
 from . import fileutils
 
 _Transaction = collections.namedtuple("Transaction",
@@ -15,68 +19,233 @@ class Transaction(_Transaction):
         return "Transaction({name}:{category} ${amount})".format(
             name=self.name, category = self.category, amount=self.amount)
 
+_TemplateSnapshot = collections.namedtuple("TemplateSnapshot",
+                                           ["transaction", "schedule", "exceptions"])
+class TemplateSnapshot(_TemplateSnapshot):
+    """Values of a TemplateTransaction at the time a forecast was computed.
+
+    Templates can be edited in place, so forecasts read these rather than the
+    template itself. The exceptions are a copy of the template's dictionary.
+    """
+    def matches(self, template):
+        """True if template still has the values in this snapshot."""
+        return (template.transaction == self.transaction
+                and template.schedule == self.schedule
+                and template.exceptions == self.exceptions)
+
+    def in_dollars(self):
+        """This snapshot of a template in cents with its amounts in dollars."""
+        return TemplateSnapshot(
+            self.transaction._replace(
+                amount=fileutils.cents_to_dollars(self.transaction.amount)),
+            self.schedule,
+            {date: fileutils.cents_to_dollars(amount)
+             for date, amount in self.exceptions.items()})
+
 class _TransactionIterator:
-    def __init__(self, default_transaction, schedule_iterator, exceptions):
+    """Pairs each scheduled date with its transaction.
+
+    Exceptions are given as sorted parallel lists of dates and prebuilt
+    Transactions, and are matched by moving a pointer forward through them
+    alongside the schedule instead of a lookup for every date.
+    """
+    def __init__(self, default_transaction, schedule_iterator,
+                 except_dates, except_transactions):
         self.default_transaction = default_transaction
         self.schedule_iterator = schedule_iterator
-        self.exceptions = exceptions
+        self.except_dates = except_dates
+        self.except_transactions = except_transactions
+        self.except_index = 0
 
     def __iter__(self):
         return self
 
     def __next__(self):
         next_date = next(self.schedule_iterator)
-        if next_date in self.exceptions:
-            except_transaction = Transaction(
-                self.default_transaction.name,
-                self.default_transaction.category,
-                self.exceptions[next_date])
-            return (next_date, except_transaction)
+        except_dates = self.except_dates
+        index = self.except_index
+        if index < len(except_dates) and except_dates[index] <= next_date:
+            if except_dates[index] < next_date:
+                index = bisect.bisect_left(except_dates, next_date, index)
+                self.except_index = index
+            if index < len(except_dates) and except_dates[index] == next_date:
+                return (next_date, self.except_transactions[index])
         return (next_date, self.default_transaction)
 
+    def advance_to(self, date):
+        """Skip ahead so the next transaction returned is the first on or
+        after date.
+        """
+        self.schedule_iterator.advance_to(date)
+
 class _TransactionView:
-    def __init__(self, transaction, schedule_view, exceptions):
+    def __init__(self, transaction, schedule_view, except_dates, except_transactions):
         self.transaction = transaction
         self.schedule_view = schedule_view
-        self.exceptions = exceptions
+        self.except_dates = except_dates
+        self.except_transactions = except_transactions
 
     def __iter__(self):
         return _TransactionIterator(self.transaction,
                                     iter(self.schedule_view),
-                                    self.exceptions)
+                                    self.except_dates,
+                                    self.except_transactions)
 
 class TemplateTransaction:
     """Template from which transactions can be generated on a schedule.
     """
     @staticmethod
-    def from_dict(data):
+    def from_dict(data, cents=False):
         """Generate a transaction template from the standard dictionary storage format.
+
+        cents - parse the amounts into integer cents, see __init__().
         """
+        parse_amount = fileutils.to_cents if cents else (lambda amount: amount)
         name     = data['name']
         category = data['category']
-        amount   = data['amount']
+        amount   = parse_amount(data['amount'])
         schedule = schedulers.from_dict(data['schedule'])
         exceptions = {}
         if 'except' in data:
             for pair in data['except']:
                 date = fileutils.str_to_date(pair['date'])
-                except_amount = pair['amount']
+                except_amount = parse_amount(pair['amount'])
                 exceptions[date] = except_amount
+        distribution = None
+        if 'distribution' in data:
+            distribution = distributions.from_dict(data['distribution'])
         return TemplateTransaction(
             name=name, category=category, amount=amount,
-            schedule=schedule, exceptions=exceptions)
+            schedule=schedule, exceptions=exceptions,
+            distribution=distribution, cents=cents)
 
-    def __init__(self, name, category, amount, schedule, exceptions={}):
+    def __init__(self, name, category, amount, schedule, exceptions={},
+                 distribution=None, cents=False):
+        """
+        Params
+        ------
+        name, category, amount - values for the generated Transactions
+        schedule - scheduler deciding the dates of the transactions
+        exceptions - dictionary of date to amount for dates where the amount
+            differs
+        distribution - (optional) how uncertain the amount is, used by
+            montecarlo.simulate(). Exceptions are always exact.
+        cents - the amount and exceptions are integer cents rather than
+            dollars. Forecasts of templates in cents add up the balances
+            exactly and convert them to dollars at the end. The distribution
+            is always in dollars.
+        """
         self.transaction = Transaction(name, category, amount)
         self.schedule = schedule
         self.exceptions = exceptions
+        self.distribution = distribution
+        self.cents = cents
+        self._exception_cache_key = None
+        self._exception_cache = None
+
+    def _sorted_exceptions(self):
+        """Exceptions sorted by date, prepared once for generating views.
+
+        Returns (dates, Transactions, datetime64[D] dates, amounts array).
+        Rebuilt whenever the transaction or the contents of the exceptions
+        change, including exceptions edited in place. Checking costs one pass
+        over the exceptions, but no sorting.
+        """
+        key = (self.transaction, tuple(self.exceptions.items()))
+        if key != self._exception_cache_key:
+            dates = sorted(self.exceptions)
+            transactions = [self.transaction._replace(amount=self.exceptions[date])
+                            for date in dates]
+            self._exception_cache = (
+                dates,
+                transactions,
+                np.array(dates, dtype='datetime64[D]'),
+                np.array([self.exceptions[date] for date in dates],
+                         dtype=self.amount_dtype))
+            self._exception_cache_key = key
+        return self._exception_cache
+
+    def snapshot(self):
+        """TemplateSnapshot of the current values of this template."""
+        return TemplateSnapshot(self.transaction, self.schedule, dict(self.exceptions))
+
+    @property
+    def amount_dtype(self):
+        """numpy type of the amounts, int64 for cents or float64 for dollars."""
+        return np.int64 if self.cents else np.float64
+
+    def in_dollars(self):
+        """This template with its amounts in dollars.
+
+        Returns the template itself if it is already in dollars.
+        """
+        if not self.cents:
+            return self
+        return TemplateTransaction(
+            self.transaction.name,
+            self.transaction.category,
+            fileutils.cents_to_dollars(self.transaction.amount),
+            self.schedule,
+            {date: fileutils.cents_to_dollars(amount)
+             for date, amount in self.exceptions.items()},
+            self.distribution)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_exception_cache_key'] = None
+        state['_exception_cache'] = None
+        return state
 
     def view(self, start, end=None, duration=None):
+        """Iterable of (date, Transaction) for the transactions within a window.
+
+        The amounts are in the template's units, integer cents if cents is set.
+        """
+        except_dates, except_transactions, _, _ = self._sorted_exceptions()
         return _TransactionView(self.transaction,
                                 self.schedule.view(start, end, duration),
-                                self.exceptions)
+                                except_dates,
+                                except_transactions)
+
+    def total(self, start, end=None, duration=None):
+        """Sum of the amounts of all transactions within a window.
+
+        Uses the schedule's occurrence count, so the cost depends on the
+        number of exceptions rather than the number of transactions. The sum
+        is in the template's units, integer cents if cents is set.
+        """
+        schedule_view = self.schedule.view(start, end, duration)
+        total = len(schedule_view) * self.transaction.amount
+        for date, amount in self.exceptions.items():
+            if date in schedule_view:
+                total += amount - self.transaction.amount
+        return total
+
+    def view_array(self, start, end=None, duration=None, subrange=None):
+        """Same as view(), but returns parallel arrays of dates and amounts.
+
+        subrange - (optional) (first, last) dates. Only the part of the view
+            between them is returned, see the schedulers' view_array().
+
+        Returns
+        -----
+        dates - datetime64[D] array of the scheduled dates
+        amounts - array with the exceptions applied, int64 for templates in
+            cents, otherwise float64
+        """
+        dates = self.schedule.view_array(start, end, duration, subrange)
+        amounts = np.full(len(dates), self.transaction.amount, dtype=self.amount_dtype)
+        if self.exceptions and len(dates):
+            _, _, except_dates, except_amounts = self._sorted_exceptions()
+            index = np.minimum(np.searchsorted(dates, except_dates),
+                               len(dates) - 1)
+            hit = dates[index] == except_dates
+            amounts[index[hit]] = except_amounts[hit]
+        return dates, amounts
 
     def __iter__(self):
+        if self.cents:
+            return iter(self.in_dollars())
         encoded = [
             ('name',     self.transaction.name),
             ('category', self.transaction.category),
@@ -92,4 +261,8 @@ class TemplateTransaction:
                                  for date, amount in self.exceptions.items()
                              ]
                             ) )
+        if self.distribution is not None:
+            encoded.append( ('distribution',
+                             { 'type': self.distribution.distribution_type,
+                               'data': dict(self.distribution) }) )
         return iter(encoded)
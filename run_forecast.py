@@ -1,24 +1,108 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
+import os
+import sys
+import time
 import budgettool as bt
+from budgettool import batch
+from budgettool.stats import ForecastStats, timed
 
 def cmdline_args():
     """ parse the commandline arguments and return them.
     """
     parser = argparse.ArgumentParser(description="generate csv file of transactions from budget")
-    parser.add_argument("in_budget", metavar="budget", help="file containing a budget")
-    parser.add_argument("-o", dest="out_csv", metavar="out", help="filename for output csv")
+    parser.add_argument("in_budget", metavar="budget",
+                        help="file containing a budget, or a directory or glob of "
+                        "budget files to forecast in batch mode")
+    parser.add_argument("-o", dest="out_csv", metavar="out",
+                        help="filename for output csv, binary records if it ends "
+                        "in .npy, or a chart if it ends in .png, .svg or .pdf. In "
+                        "batch mode, the directory for the output files, by "
+                        "default next to each budget")
+    parser.add_argument("--npy", action="store_true",
+                        help="batch mode: save binary .npy records instead of csv")
+    parser.add_argument("--charts", action="store_true",
+                        help="batch mode: also save a .png chart of each forecast")
+    parser.add_argument("--sqlite", dest="database", metavar="db",
+                        help="save the forecasts into this SQLite database, keyed by "
+                        "absolute budget filename")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the time of each stage and the busiest templates, "
+                        "not in batch mode")
+    parser.add_argument("--stats", dest="stats_json", metavar="json",
+                        help="save the time of each stage and the entries of each "
+                        "template as json, not in batch mode")
+    parser.add_argument("--cents", action="store_true",
+                        help="add up the balances exactly in integer cents")
+    parser.add_argument("--cache", dest="cache_dir", metavar="dir",
+                        help="directory to cache parsed budgets between runs")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="batch mode: number of worker processes (default: cpu count)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="batch mode: number of files sent to a worker at a time")
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if is_batch(args.in_budget) and (args.profile or args.stats_json is not None):
+        parser.error("--profile and --stats only work with a single budget")
+    return args
+
+def is_batch(in_budget):
+    return os.path.isdir(in_budget) or any(c in in_budget for c in "*?[")
+
+def run_batch(args):
+    filenames = batch.find_budgets(args.in_budget)
+    start = time.perf_counter()
+    if args.database is not None:
+        results = batch.forecast_to_sqlite(filenames, args.database,
+                                           workers=args.workers,
+                                           chunksize=args.chunksize,
+                                           cache_dir=args.cache_dir,
+                                           cents=args.cents)
+    else:
+        results = batch.forecast_files(filenames,
+                                       out_dir=args.out_csv,
+                                       workers=args.workers,
+                                       chunksize=args.chunksize,
+                                       cache_dir=args.cache_dir,
+                                       binary=args.npy,
+                                       charts=args.charts,
+                                       cents=args.cents)
+    print(batch.format_report(results, time.perf_counter() - start))
+    return 1 if any(result.error is not None for result in results) else 0
 
 if __name__ == "__main__":
     args = cmdline_args()
 
-    budget = bt.budget_from_json(args.in_budget)
-    forecast = budget.forecast()
-    if args.out_csv is None:
-        bt.plot_forecast(forecast)
-    else:
-        bt.save_forecast_to_csv(forecast, args.out_csv)
+    if is_batch(args.in_budget):
+        sys.exit(run_batch(args))
 
+    stats = None
+    if args.profile or args.stats_json is not None:
+        stats = ForecastStats()
+
+    budget = bt.budget_from_json(args.in_budget, cache_dir=args.cache_dir, stats=stats,
+                                 cents=args.cents)
+    forecast = budget.forecast(columnar=True, stats=stats)
+    with timed(stats, 'export'):
+        if args.database is not None:
+            bt.save_forecast_to_sqlite(forecast, args.database,
+                                       os.path.abspath(args.in_budget))
+        if args.out_csv is not None:
+            if args.out_csv.endswith(('.png', '.svg', '.pdf')):
+                bt.render_forecast(forecast, args.out_csv)
+            elif args.out_csv.endswith('.npy'):
+                bt.save_forecast_to_npy(forecast, args.out_csv)
+            else:
+                bt.save_forecast_to_csv(forecast, args.out_csv)
+
+    if args.profile:
+        print(stats.format_report(), file=sys.stderr)
+    if args.stats_json is not None:
+        with open(args.stats_json, 'w') as outfile:
+            json.dump(stats.as_dict(), outfile, indent=4)
+
+    # the plot window stays open until it is closed, so it isn't timed
+    if args.out_csv is None and args.database is None:
+        bt.plot_forecast(forecast)